@@ -13,6 +13,14 @@ echo.
 echo Installing OpenAI Whisper...
 pip install openai-whisper
 
+echo.
+echo Installing faster-whisper (optional, faster CPU backend)...
+pip install faster-whisper
+
+echo.
+echo Installing PyAV (optional, decodes audio when FFmpeg is missing)...
+pip install av
+
 echo.
 echo Installing LibreTranslate (optional)...
 pip install libretranslate
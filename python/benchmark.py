@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Python audio pipeline
+"""
+
+import sys
+import os
+import argparse
+import json
+import subprocess
+import tempfile
+import time
+
+import transcribe
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB
+
+    Returns:
+        float: Peak RSS, or None if it cannot be measured on this platform
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except (ImportError, AttributeError):
+        return None
+
+def make_test_clip(seconds, output_path):
+    """
+    Generate a synthetic WebM/Opus clip with ffmpeg
+
+    Args:
+        seconds (float): Clip duration
+        output_path (str): Output file path
+    """
+    ffmpeg = transcribe.find_ffmpeg()
+    if ffmpeg is None:
+        raise FileNotFoundError('ffmpeg is required to generate benchmark clips')
+
+    cmd = [
+        ffmpeg['path'], '-nostats', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={seconds}',
+        '-c:a', 'libopus', '-b:a', '32k',
+        '-y', output_path
+    ]
+    subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, check=True)
+
+def time_call(func, repeat=3):
+    """
+    Time a call several times
+
+    Returns:
+        dict: Best and mean wall-clock time in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'best_ms': round(min(timings), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2)
+    }
+
+def benchmark_decode(durations, repeat=3):
+    """
+    Compare the ffmpeg subprocess decoder with the in-process PyAV decoder
+
+    Args:
+        durations (list): Clip lengths in seconds
+        repeat (int): Runs per measurement
+
+    Returns:
+        list: One result dict per clip length
+    """
+    results = []
+    for seconds in durations:
+        with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as tmp_file:
+            clip_path = tmp_file.name
+
+        try:
+            make_test_clip(seconds, clip_path)
+            with open(clip_path, 'rb') as f:
+                data = f.read()
+
+            result = {'seconds': seconds, 'bytes': len(data)}
+            result['ffmpeg'] = time_call(lambda: transcribe._ffmpeg_decode('pipe:0', data), repeat)
+            try:
+                result['pyav'] = time_call(lambda: transcribe._pyav_decode(data), repeat)
+            except ImportError:
+                result['pyav'] = None
+            results.append(result)
+            print(f"Decoded {seconds}s clip", file=sys.stderr)
+
+        finally:
+            try:
+                os.unlink(clip_path)
+            except:
+                pass
+
+    return results
+
+def write_wav(output_path, audio):
+    """
+    Write 16 kHz mono float32 samples as a 16-bit PCM WAV file
+
+    Args:
+        output_path (str): Output WAV file path
+        audio (numpy.ndarray): Samples in [-1, 1]
+    """
+    import wave
+    import numpy as np
+
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(output_path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(transcribe.SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+
+def benchmark_wav(durations, repeat=3):
+    """
+    Compare ffmpeg decoding with the memory-mapped fast path for 16 kHz mono WAV
+
+    Args:
+        durations (list): Clip lengths in seconds
+        repeat (int): Runs per measurement
+
+    Returns:
+        list: One result dict per clip length, with milliseconds saved per clip
+    """
+    import numpy as np
+
+    results = []
+    for seconds in durations:
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
+            wav_path = tmp_file.name
+
+        try:
+            t = np.arange(int(seconds * transcribe.SAMPLE_RATE)) / transcribe.SAMPLE_RATE
+            write_wav(wav_path, 0.5 * np.sin(2 * np.pi * 440 * t))
+
+            result = {'seconds': seconds}
+            result['ffmpeg'] = time_call(lambda: transcribe._decode(wav_path), repeat)
+            result['fast_path'] = time_call(lambda: transcribe.load_audio_file(wav_path), repeat)
+            result['saved_ms'] = round(result['ffmpeg']['best_ms'] - result['fast_path']['best_ms'], 2)
+            results.append(result)
+            print(f"Loaded {seconds}s WAV", file=sys.stderr)
+
+        finally:
+            try:
+                os.unlink(wav_path)
+            except:
+                pass
+
+    return results
+
+def write_long_wav(seconds, output_path, block_seconds=60):
+    """
+    Write a synthetic 16 kHz mono 16-bit WAV file block by block
+
+    Args:
+        seconds (float): File duration
+        output_path (str): Output WAV file path
+        block_seconds (float): Audio generated per write
+    """
+    import wave
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    block = int(block_seconds * transcribe.SAMPLE_RATE)
+    remaining = int(seconds * transcribe.SAMPLE_RATE)
+    with wave.open(output_path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(transcribe.SAMPLE_RATE)
+        while remaining > 0:
+            n = min(block, remaining)
+            wav.writeframes((rng.standard_normal(n) * 3000).astype('<i2').tobytes())
+            remaining -= n
+
+def run_low_memory_once(audio_path, model_name=None):
+    """
+    Walk a WAV file in low-memory mode, measuring this process only
+
+    Without a model only the windows are materialized, which isolates the
+    audio handling from the model's own memory.
+
+    Returns:
+        dict: Windows read, audio length and peak RSS
+    """
+    if model_name:
+        result = transcribe.transcribe_low_memory(audio_path, model_name)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        windows = None
+        audio_seconds = result['segments'][-1]['end'] if result['segments'] else 0.0
+    else:
+        windows = 0
+        audio_seconds = 0.0
+        for _, window in transcribe.iter_wav_windows(audio_path):
+            windows += 1
+            audio_seconds += len(window) / transcribe.SAMPLE_RATE
+
+    return {
+        'windows': windows,
+        'audio_s': round(audio_seconds, 1),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def benchmark_memory(hours, max_rss_mb, model_name=None):
+    """
+    Check that low-memory mode keeps peak RSS bounded on a long file
+
+    A synthetic recording is written to a temporary file and processed in a
+    fresh process so its peak RSS is measured on its own.
+
+    Args:
+        hours (float): Length of the synthetic recording
+        max_rss_mb (float): Largest acceptable peak RSS
+        model_name (str): Also run this model on every window (optional)
+
+    Returns:
+        dict: Measurements and whether the bound held ('passed')
+    """
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
+        wav_path = tmp_file.name
+
+    try:
+        print(f"Writing {hours} h synthetic WAV", file=sys.stderr)
+        write_long_wav(hours * 3600, wav_path)
+
+        cmd = [sys.executable, os.path.abspath(__file__), 'memory-run', '--input', wav_path]
+        if model_name:
+            cmd += ['--model', model_name]
+        run = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        if run.returncode != 0:
+            raise RuntimeError(run.stderr.strip().splitlines()[-1] if run.stderr.strip() else 'failed')
+
+        result = json.loads(run.stdout)
+        result['file_mb'] = round(os.path.getsize(wav_path) / (1024 * 1024), 1)
+        # What decoding the whole file to float32 at once would take
+        result['full_decode_mb'] = round(result['file_mb'] * 2, 1)
+        result['max_rss_mb'] = max_rss_mb
+        result['passed'] = result['peak_rss_mb'] is not None and result['peak_rss_mb'] <= max_rss_mb
+        return result
+
+    finally:
+        try:
+            os.unlink(wav_path)
+        except:
+            pass
+
+def run_backend_once(audio_path, backend, model_name):
+    """
+    Load a model and transcribe one file, measuring this process only
+
+    Returns:
+        dict: Load time, transcription time, audio length and peak RSS
+    """
+    audio = transcribe.load_audio_file(audio_path)
+
+    start = time.perf_counter()
+    model = transcribe.load_model(model_name, backend=backend)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = transcribe.run_model(model, audio)
+    transcribe_seconds = time.perf_counter() - start
+
+    return {
+        'load_s': round(load_seconds, 2),
+        'transcribe_s': round(transcribe_seconds, 2),
+        'audio_s': round(len(audio) / transcribe.SAMPLE_RATE, 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'text': result['text']
+    }
+
+def benchmark_backends(audio_path, backends, models):
+    """
+    Compare real-time factor and peak RSS across backends and model sizes
+
+    Each combination runs in a fresh process so peak RSS is not shared.
+
+    Args:
+        audio_path (str): Audio file to transcribe (ideally real speech)
+        backends (list): Backend names
+        models (list): Whisper model sizes
+
+    Returns:
+        list: One result dict per combination
+    """
+    results = []
+    for backend in backends:
+        for model_name in models:
+            cmd = [sys.executable, os.path.abspath(__file__), 'backend-run',
+                   '--input', audio_path, '--backend', backend, '--model', model_name]
+            run = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+            result = {'backend': backend, 'model': model_name}
+            try:
+                result.update(json.loads(run.stdout))
+                result['rtf'] = round(result['transcribe_s'] / result['audio_s'], 3)
+                result.pop('text', None)
+            except (ValueError, KeyError, ZeroDivisionError):
+                result['error'] = run.stderr.strip().splitlines()[-1] if run.stderr.strip() else 'failed'
+            results.append(result)
+            print(f"Benchmarked {backend} / {model_name}", file=sys.stderr)
+    return results
+
+def benchmark_batch(paths, model_name, batch_sizes, language=None):
+    """
+    Compare batched and one-at-a-time decoding of short clips
+
+    Args:
+        paths (list): Audio files of up to 30 seconds each
+        model_name (str): Whisper model size
+        batch_sizes (list): Batch sizes to measure
+        language (str): Spoken language code (optional)
+
+    Returns:
+        list: One result dict per batch size
+    """
+    clips = [transcribe.load_audio_file(path) for path in paths]
+    audio_seconds = sum(len(audio) for audio in clips) / transcribe.SAMPLE_RATE
+    model = transcribe.load_model(model_name)
+
+    results = []
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(clips), batch_size):
+            transcribe.run_model_batch(model, clips[i:i + batch_size], language)
+        seconds = time.perf_counter() - start
+        results.append({
+            'batch_size': batch_size,
+            'clips': len(clips),
+            'seconds': round(seconds, 2),
+            'rtf': round(seconds / audio_seconds, 3)
+        })
+        print(f"Benchmarked batch size {batch_size}", file=sys.stderr)
+    return results
+
+def word_error_rate(reference, hypothesis):
+    """
+    Word error rate of a hypothesis against a reference transcript
+
+    Words are compared case-insensitively with punctuation stripped.
+
+    Returns:
+        tuple: (word edits, reference word count)
+    """
+    def words(text):
+        return ''.join(c.lower() if c.isalnum() or c.isspace() else ' ' for c in text).split()
+
+    ref = words(reference)
+    hyp = words(hypothesis)
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+def benchmark_quantize(directory, model_name, dtypes=('float32', 'int8'), language=None):
+    """
+    Compare accuracy and speed of full-precision and int8 models on CPU
+
+    Every audio file in the directory needs a reference transcript next to
+    it with the same name and a .txt extension.
+
+    Args:
+        directory (str): Directory of audio files and reference transcripts
+        model_name (str): Whisper model size
+        dtypes (tuple): Weight dtypes to compare
+        language (str): Spoken language code (optional)
+
+    Returns:
+        list: One result dict per dtype with WER and real-time factor
+    """
+    pairs = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        reference_path = os.path.join(directory, stem + '.txt')
+        if ext.lower() != '.txt' and os.path.exists(reference_path):
+            with open(reference_path, encoding='utf-8') as f:
+                pairs.append((transcribe.load_audio_file(os.path.join(directory, name)), f.read()))
+    if not pairs:
+        raise FileNotFoundError(f'No audio files with .txt references in {directory}')
+
+    results = []
+    for dtype in dtypes:
+        start = time.perf_counter()
+        model = transcribe.load_model(model_name, 'cpu', dtype)
+        load_seconds = time.perf_counter() - start
+
+        edits = words = 0
+        audio_seconds = transcribe_seconds = 0.0
+        for audio, reference in pairs:
+            start = time.perf_counter()
+            result = transcribe.run_model(model, audio, language)
+            transcribe_seconds += time.perf_counter() - start
+            audio_seconds += len(audio) / transcribe.SAMPLE_RATE
+            file_edits, file_words = word_error_rate(reference, result['text'])
+            edits += file_edits
+            words += file_words
+
+        results.append({
+            'dtype': dtype,
+            'files': len(pairs),
+            'load_s': round(load_seconds, 2),
+            'rtf': round(transcribe_seconds / audio_seconds, 3) if audio_seconds else None,
+            'wer': round(edits / words, 4) if words else None,
+            'model_mb': round(transcribe.estimate_model_size_mb(model), 1)
+        })
+        print(f"Benchmarked {model_name} / {dtype}", file=sys.stderr)
+        transcribe.model_registry.clear()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HearAI audio pipeline')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    decode_parser = subparsers.add_parser('decode', help='Compare ffmpeg and PyAV WebM/Opus decoding')
+    decode_parser.add_argument('--durations', type=float, nargs='+', default=[5, 60, 600],
+                              help='Clip lengths in seconds')
+    decode_parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+
+    wav_parser = subparsers.add_parser('wav', help='Compare ffmpeg with the 16 kHz mono WAV fast path')
+    wav_parser.add_argument('--durations', type=float, nargs='+', default=[5, 60, 600],
+                           help='Clip lengths in seconds')
+    wav_parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+
+    backends_parser = subparsers.add_parser('backends', help='Compare transcription backends and model sizes')
+    backends_parser.add_argument('--input', '-i', help='Audio file (default: synthetic 60 s clip)')
+    backends_parser.add_argument('--backends', nargs='+', default=sorted(transcribe.BACKENDS),
+                                choices=sorted(transcribe.BACKENDS))
+    backends_parser.add_argument('--models', nargs='+', default=['tiny', 'base', 'small'])
+
+    memory_parser = subparsers.add_parser('memory', help='Check peak RSS of low-memory mode on a long file')
+    memory_parser.add_argument('--hours', type=float, default=3, help='Length of the synthetic recording')
+    memory_parser.add_argument('--max-rss-mb', type=float, default=150,
+                              help='Fail if peak RSS exceeds this (raise it to cover the model with --model)')
+    memory_parser.add_argument('--model', help='Also transcribe every window with this model')
+
+    memory_run_parser = subparsers.add_parser('memory-run', help=argparse.SUPPRESS)
+    memory_run_parser.add_argument('--input', '-i', required=True)
+    memory_run_parser.add_argument('--model')
+
+    run_parser = subparsers.add_parser('backend-run', help=argparse.SUPPRESS)
+    run_parser.add_argument('--input', '-i', required=True)
+    run_parser.add_argument('--backend', required=True)
+    run_parser.add_argument('--model', required=True)
+
+    quantize_parser = subparsers.add_parser('quantize', help='Compare float32 and int8 accuracy and speed on CPU')
+    quantize_parser.add_argument('--input-dir', required=True,
+                                help='Directory of audio files with matching .txt reference transcripts')
+    quantize_parser.add_argument('--model', default='base')
+    quantize_parser.add_argument('--language', '-l', help='Spoken language code (optional)')
+
+    batch_parser = subparsers.add_parser('batch', help='Compare batched and sequential decoding of short clips')
+    batch_parser.add_argument('--input', '-i', nargs='+', required=True, help='Clips of up to 30 s')
+    batch_parser.add_argument('--model', default='base')
+    batch_parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8])
+    batch_parser.add_argument('--language', '-l', help='Spoken language code (optional)')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'decode':
+        results = benchmark_decode(args.durations, args.repeat)
+    elif args.benchmark == 'wav':
+        results = benchmark_wav(args.durations, args.repeat)
+    elif args.benchmark == 'memory-run':
+        results = run_low_memory_once(args.input, args.model)
+    elif args.benchmark == 'memory':
+        results = benchmark_memory(args.hours, args.max_rss_mb, args.model)
+        print(json.dumps(results, indent=2))
+        return 0 if results['passed'] else 1
+    elif args.benchmark == 'backend-run':
+        results = run_backend_once(args.input, args.backend, args.model)
+    elif args.benchmark == 'batch':
+        results = benchmark_batch(args.input, args.model, args.batch_sizes, args.language)
+    elif args.benchmark == 'quantize':
+        results = benchmark_quantize(args.input_dir, args.model, language=args.language)
+    elif args.benchmark == 'backends':
+        clip_path = args.input
+        if not clip_path:
+            with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as tmp_file:
+                clip_path = tmp_file.name
+            make_test_clip(60, clip_path)
+        try:
+            results = benchmark_backends(clip_path, args.backends, args.models)
+        finally:
+            if not args.input:
+                os.unlink(clip_path)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
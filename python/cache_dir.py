@@ -0,0 +1,21 @@
+"""
+Location of HearAI's on-disk caches, shared by the Python scripts
+"""
+
+import os
+from pathlib import Path
+
+def get_cache_dir():
+    """
+    Directory for HearAI's on-disk caches
+    
+    Uses HEARAI_CACHE_DIR when set, otherwise the per-user cache location.
+    
+    Returns:
+        Path: Cache directory (not necessarily existing yet)
+    """
+    if os.environ.get('HEARAI_CACHE_DIR'):
+        return Path(os.environ['HEARAI_CACHE_DIR'])
+    if os.name == 'nt' and os.environ.get('LOCALAPPDATA'):
+        return Path(os.environ['LOCALAPPDATA']) / 'HearAI' / 'cache'
+    return Path.home() / '.cache' / 'hearai'
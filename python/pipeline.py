@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Transcribe-and-translate pipeline running in a single process
+
+Audio is transcribed window by window; each finished segment is handed to a
+translation thread straight away, so translation overlaps with the rest of
+the transcription. Results are streamed as JSON lines.
+"""
+
+import sys
+import os
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from transcribe import (
+    SAMPLE_RATE, SILENCE_SEARCH_SECONDS, BACKENDS, DEFAULT_BACKEND, install_requirements,
+    load_model, load_audio_file, decode_audio_bytes, find_split_points, run_model
+)
+from translate import TranslationCache, translate_text
+
+# Target length of the windows transcribed one after another. Boundaries
+# move by up to half the silence search either way, so this keeps every
+# window within Whisper's 30-second context (one decoder pass each)
+PIPELINE_CHUNK_SECONDS = 30 - SILENCE_SEARCH_SECONDS / 2
+
+# Segments translated at once while transcription continues
+TRANSLATION_WORKERS = 4
+
+def run_pipeline(audio, target_lang, emit, model_name="base", language=None,
+                 source_lang='auto', service='libretranslate', vad=False,
+                 chunk_seconds=PIPELINE_CHUNK_SECONDS, cache=None, backend=None, dtype=None,
+                 **kwargs):
+    """
+    Transcribe audio and translate each segment as soon as it is final
+
+    Args:
+        audio (numpy.ndarray): 16 kHz mono samples
+        target_lang (str): Target language code
+        emit (callable): Called with every event dict; may be called from
+            several threads
+        model_name (str): Whisper model to use
+        language (str): Spoken language code (optional, auto-detect if None)
+        source_lang (str): Source language code for translation
+        service (str): Translation service ('libretranslate' or 'google')
+        vad (bool): Drop non-speech regions before inference
+        chunk_seconds (float): Target length of each transcription window
+        cache (TranslationCache): Translation cache; the process-wide cache
+            if None, no caching if False
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+        **kwargs: Additional translation service parameters
+
+    Returns:
+        dict: Final result with the full text, translation and segments
+    """
+    model = load_model(model_name, dtype=dtype, backend=backend)
+    points = find_split_points(audio, chunk_seconds)
+    segments = []
+
+    def translate_segment(index, segment):
+        result = translate_text(segment['text'], target_lang, source_lang, service, cache, **kwargs)
+        segment['translated_text'] = result.get('translated_text', '')
+        event = {
+            'type': 'translation',
+            'index': index,
+            'success': result['success'],
+            'translated_text': segment['translated_text']
+        }
+        if not result['success']:
+            event['error'] = result.get('error', '')
+        emit(event)
+        return result
+
+    detected_language = language
+    with ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS) as pool:
+        futures = []
+        for start, end in zip(points[:-1], points[1:]):
+            result = run_model(model, audio[start:end], detected_language, vad, start / SAMPLE_RATE)
+            # Keep the first detected language for the remaining windows
+            if not detected_language and result['segments']:
+                detected_language = result['language']
+
+            for segment in result['segments']:
+                if not segment['text']:
+                    continue
+                index = len(segments)
+                segments.append(segment)
+                emit(dict(segment, type='segment', index=index))
+                futures.append(pool.submit(translate_segment, index, segment))
+
+        translations = [future.result() for future in futures]
+
+    return {
+        'type': 'done',
+        'success': all(result['success'] for result in translations),
+        'text': ' '.join(segment['text'] for segment in segments),
+        'translated_text': ' '.join(segment['translated_text'] for segment in segments),
+        'language': detected_language or 'unknown',
+        'target_language': target_lang,
+        'segments': segments
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcribe audio and translate it in one process')
+    parser.add_argument('--input', '-i', help='Input audio file path')
+    parser.add_argument('--stdin', action='store_true',
+                       help='Read audio data from stdin')
+    parser.add_argument('--model', '-m', default='base',
+                       choices=['tiny', 'base', 'small', 'medium', 'large'],
+                       help='Whisper model size')
+    parser.add_argument('--language', '-l', help='Spoken language code (optional)')
+    parser.add_argument('--backend', '-b', default=DEFAULT_BACKEND, choices=sorted(BACKENDS),
+                       help='Transcription backend')
+    parser.add_argument('--quantize', choices=['int8'],
+                       help='Run on CPU with int8 weights (quantized once, then cached on disk)')
+    parser.add_argument('--target', '-tl', required=True, help='Target language code')
+    parser.add_argument('--source', '-sl', default='auto', help='Source language code (default: auto)')
+    parser.add_argument('--service', '-s', default='libretranslate',
+                       choices=['libretranslate', 'google'],
+                       help='Translation service to use')
+    parser.add_argument('--api-key', help='API key for Google Translate')
+    parser.add_argument('--api-url', default='http://localhost:5000',
+                       help='LibreTranslate API URL')
+    parser.add_argument('--vad', action='store_true',
+                       help='Skip silence before inference')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the translation cache')
+
+    args = parser.parse_args()
+
+    if not args.stdin and not args.input:
+        parser.error('Either --input or --stdin must be specified')
+
+    output_lock = threading.Lock()
+
+    def emit(event):
+        line = json.dumps(event, ensure_ascii=False)
+        with output_lock:
+            print(line, flush=True)
+
+    try:
+        if not install_requirements(args.backend):
+            emit({'type': 'done', 'success': False, 'error': 'Failed to install required packages'})
+            return 1
+
+        if args.stdin:
+            audio = decode_audio_bytes(sys.stdin.buffer.read())
+        elif not os.path.exists(args.input):
+            emit({'type': 'done', 'success': False, 'error': f'Input file not found: {args.input}'})
+            return 1
+        else:
+            audio = load_audio_file(args.input)
+
+        result = run_pipeline(
+            audio, args.target, emit, args.model, args.language,
+            args.source, args.service, args.vad,
+            cache=False if args.no_cache else TranslationCache(),
+            backend=args.backend, dtype=args.quantize,
+            api_key=args.api_key, api_url=args.api_url
+        )
+        emit(result)
+        return 0 if result['success'] else 1
+
+    except Exception as e:
+        print(f"Pipeline error: {e}", file=sys.stderr)
+        emit({'type': 'done', 'success': False, 'error': str(e)})
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Supervisor keeping warm transcription workers parked
+
+Starting transcribe.py costs several seconds of importing torch and Whisper
+and loading the model before any audio is touched. The supervisor keeps
+--workers `transcribe.py --serve` processes started ahead of time, each
+with its model already loaded, and hands every incoming job to one that is
+ready over its stdin/stdout pipe. Workers are reused for every job by
+default; with --jobs-per-worker a worker is retired after that many jobs,
+and its successor starts loading while the last of them runs, so the cold
+start stays off the path of a request.
+
+Jobs and results use the same JSON lines as `transcribe.py --serve`.
+"""
+
+import sys
+import os
+import json
+import argparse
+import importlib.util
+import queue
+import subprocess
+import threading
+
+from transcribe import BACKENDS, DEFAULT_BACKEND, worker_threads
+
+# Workers kept warm when --workers is not given
+DEFAULT_SUPERVISOR_WORKERS = 2
+
+TRANSCRIBE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'transcribe.py')
+
+class Worker:
+    """A `transcribe.py --serve` process answering one JSON line per request"""
+
+    def __init__(self, args):
+        self.process = subprocess.Popen(
+            [sys.executable, TRANSCRIBE_SCRIPT, '--serve'] + args,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding='utf-8', bufsize=1
+        )
+        self.jobs = 0
+
+    def wait_ready(self):
+        """
+        Block until the worker has loaded its model
+
+        Returns:
+            bool: True if the worker reported ready, False if it exited
+        """
+        line = self.process.stdout.readline()
+        try:
+            return bool(line) and json.loads(line).get('ready', False)
+        except ValueError:
+            return False
+
+    def request(self, job):
+        """
+        Send one job and wait for its result
+
+        Returns:
+            dict: The worker's result, or None if the worker died or
+                answered with something other than a JSON object
+        """
+        try:
+            self.process.stdin.write(json.dumps(job, ensure_ascii=False) + '\n')
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+            self.jobs += 1
+            result = json.loads(line) if line else None
+        except (OSError, ValueError):
+            return None
+        return result if isinstance(result, dict) else None
+
+    def stop(self):
+        """Close the worker's stdin so it exits once idle"""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+class Supervisor:
+    """
+    Pool of warm transcription workers fed from a shared job queue
+
+    Every worker slot runs its own thread: it starts a worker, waits until
+    the model is loaded, then takes jobs from the queue. A worker that
+    crashed is restarted; with jobs_per_worker set, a worker is also retired
+    after that many jobs, its successor loading while the last one runs.
+    """
+
+    def __init__(self, worker_args, workers=DEFAULT_SUPERVISOR_WORKERS, jobs_per_worker=0):
+        self.worker_args = worker_args
+        self.workers = workers
+        self.jobs_per_worker = jobs_per_worker
+        self.jobs = queue.Queue()
+        # Set once a worker is ready, or once every initial worker has failed
+        self.ready = threading.Event()
+        self.healthy = False
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self, emit):
+        """
+        Start the worker slots
+
+        Args:
+            emit (callable): Called with every result dict; may be called
+                from several threads
+        """
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._run_slot, args=(emit,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job):
+        """Queue a job for the next ready worker"""
+        self.jobs.put(job)
+
+    def shutdown(self):
+        """Finish the queued jobs, then stop every worker"""
+        for _ in self._threads:
+            self.jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _spawn(self, worker=None):
+        """Wait until worker (a new one if None) is ready; None if it failed"""
+        worker = worker or Worker(self.worker_args)
+        if not worker.wait_ready():
+            worker.stop()
+            with self._lock:
+                self._failures += 1
+                if self._failures >= self.workers:
+                    self.ready.set()
+            return None
+        self.healthy = True
+        self.ready.set()
+        return worker
+
+    def _run_slot(self, emit):
+        worker = self._spawn()
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+
+            if worker is None:
+                worker = self._spawn()
+            # Start the successor now so it loads while the last job runs
+            successor = None
+            if worker and self.jobs_per_worker and worker.jobs + 1 >= self.jobs_per_worker:
+                successor = Worker(self.worker_args)
+            result = worker.request(job) if worker else None
+            crashed = result is None
+            if crashed:
+                result = {
+                    'id': job.get('id'),
+                    'success': False,
+                    'error': 'Transcription worker failed to answer',
+                    'text': '',
+                    'language': 'unknown',
+                    'segments': []
+                }
+            emit(result)
+
+            if crashed or successor:
+                if worker is not None:
+                    worker.stop()
+                worker = self._spawn(successor)
+
+        if worker is not None:
+            worker.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep warm transcription workers and dispatch jobs to them')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_SUPERVISOR_WORKERS,
+                       help='Workers kept loaded and ready')
+    parser.add_argument('--jobs-per-worker', type=int, default=0,
+                       help='Jobs a worker serves before it is replaced (default: 0, never)')
+    parser.add_argument('--model', '-m', default='base',
+                       choices=['tiny', 'base', 'small', 'medium', 'large'],
+                       help='Whisper model size')
+    parser.add_argument('--language', '-l', help='Language code (optional)')
+    parser.add_argument('--backend', '-b', default=DEFAULT_BACKEND, choices=sorted(BACKENDS),
+                       help='Transcription backend')
+    parser.add_argument('--quantize', choices=['int8'],
+                       help='Run on CPU with int8 weights')
+    parser.add_argument('--threads', type=int,
+                       help='Intra-op CPU threads per worker (default: available CPUs split between workers)')
+
+    args = parser.parse_args()
+
+    # Only look the backend up: importing it here would load torch into the dispatcher
+    backend = BACKENDS[args.backend]
+    if importlib.util.find_spec(backend.module) is None:
+        print(f"{backend.display_name} not found. Please install it:", file=sys.stderr)
+        print(f"Run: pip install {backend.package}", file=sys.stderr)
+        print(json.dumps({'ready': False, 'error': 'Failed to install required packages'}), flush=True)
+        return 1
+
+    # Parked workers mostly wait, so their count is not capped at the CPUs
+    worker_args = ['--model', args.model, '--backend', args.backend,
+                   '--threads', str(worker_threads(args.workers, args.threads))]
+    if args.language:
+        worker_args += ['--language', args.language]
+    if args.quantize:
+        worker_args += ['--quantize', args.quantize]
+
+    output_lock = threading.Lock()
+
+    def emit(result):
+        line = json.dumps(result, ensure_ascii=False)
+        with output_lock:
+            print(line, flush=True)
+
+    supervisor = Supervisor(worker_args, args.workers, args.jobs_per_worker)
+    supervisor.start(emit)
+    supervisor.ready.wait()
+    if not supervisor.healthy:
+        emit({'ready': False, 'error': 'No transcription worker could be started'})
+        return 1
+    emit({'ready': True, 'workers': args.workers, 'model': args.model})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError('Request must be a JSON object')
+        except ValueError as e:
+            emit({'id': None, 'success': False, 'error': f'Invalid request: {e}',
+                  'text': '', 'language': 'unknown', 'segments': []})
+            continue
+        supervisor.submit(job)
+
+    supervisor.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,65 +5,1582 @@ Whisper-based audio transcription script for the Electron app
 
 import sys
 import os
+import shutil
+import subprocess
 import tempfile
 import argparse
+import base64
+import time
+import glob
 import json
 from pathlib import Path
 
-def install_requirements():
+from collections import OrderedDict
+
+from cache_dir import get_cache_dir
+
+# Whisper operates on 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# Resolved ffmpeg (see find_ffmpeg); False means "looked, not found"
+_ffmpeg_info = None
+
+# Long-form mode defaults: chunk length, overlap between neighbouring
+# chunks, and how far from the target boundary to look for silence
+DEFAULT_CHUNK_SECONDS = 120
+DEFAULT_CHUNK_OVERLAP = 2.0
+SILENCE_SEARCH_SECONDS = 10.0
+
+# Target window length in low-memory mode; with the silence search around
+# it, windows stay within Whisper's 30-second context
+LOW_MEMORY_CHUNK_SECONDS = 25
+
+# Whisper timestamp tokens are 20 ms apart
+BATCH_TIME_PRECISION = 0.02
+
+# Longest clip decoded in a batch: Whisper's fixed input window
+BATCH_WINDOW_SECONDS = 30
+
+# File extensions picked up when --input names a directory
+AUDIO_EXTENSIONS = {'.wav', '.webm', '.ogg', '.opus', '.mp3', '.m4a', '.mp4', '.flac', '.aac'}
+
+# Voice activity detection: analysis frame, padding kept around speech,
+# shortest pause that splits two speech regions, and the energy detector's
+# margin above the estimated noise floor (clamped to a fixed dBFS range so
+# steady, pause-free audio is not mistaken for noise)
+VAD_FRAME_MS = 30
+VAD_PADDING_MS = 300
+VAD_MIN_SILENCE_MS = 500
+VAD_ENERGY_MARGIN_DB = 12.0
+VAD_MIN_THRESHOLD_DB = -50.0
+VAD_MAX_THRESHOLD_DB = -35.0
+
+# Streaming mode defaults: how much new audio triggers a pass, the longest
+# unfinalized buffer, and how close to the buffer end a segment must not
+# reach before it is considered final
+DEFAULT_STREAM_STEP = 2.0
+DEFAULT_STREAM_WINDOW = 30.0
+STREAM_FINALIZE_MARGIN = 1.0
+
+# Default memory budget for models kept resident by the model registry
+DEFAULT_MODEL_CACHE_MB = 2048
+
+# Default on-disk budget for cached transcription results
+DEFAULT_RESULT_CACHE_MB = 256
+
+# Transcription backend used when none is requested
+DEFAULT_BACKEND = 'openai-whisper'
+
+# Approximate parameter counts (millions) of the Whisper model sizes, used
+# to estimate memory for backends that do not expose their weights
+WHISPER_PARAMS_M = {
+    'tiny': 39,
+    'base': 74,
+    'small': 244,
+    'medium': 769,
+    'large': 1550
+}
+
+def install_requirements(backend=DEFAULT_BACKEND):
     """Check if required packages are available"""
     try:
-        import whisper
-        return True
+        __import__(BACKENDS[backend].module)
+        return True
+    except ImportError:
+        print(f"{BACKENDS[backend].display_name} not found. Please install it:", file=sys.stderr)
+        print(f"Run: pip install {BACKENDS[backend].package}", file=sys.stderr)
+        print("Or use the install-python-deps.bat file", file=sys.stderr)
+        return False
+
+class OpenAIWhisperBackend:
+    """Reference openai-whisper implementation on PyTorch"""
+    
+    name = 'openai-whisper'
+    display_name = 'OpenAI Whisper'
+    module = 'whisper'
+    package = 'openai-whisper'
+    
+    def default_dtype(self, device):
+        return 'float32'
+    
+    def load(self, model_name, device, dtype):
+        """
+        Load a model
+        
+        Returns:
+            Object whose transcribe(audio, **options) returns a Whisper-style
+            result dict ('text', 'language', 'segments')
+        """
+        import whisper
+        if dtype == 'int8':
+            return self._load_int8(model_name, device)
+        
+        model = whisper.load_model(model_name, device=device)
+        if dtype == 'float16':
+            if device == 'cpu':
+                print("float16 weights are not supported on CPU, using float32", file=sys.stderr)
+            else:
+                model = model.half()
+        return model
+
+    def _load_int8(self, model_name, device):
+        """
+        Load a model with int8 dynamically quantized linear layers
+        
+        Quantizing takes a while, so the quantized model is stored in the
+        cache directory and reused by later processes. The cache file name
+        includes the checkpoint, whisper and torch versions.
+        """
+        import torch
+        import whisper
+        
+        if device != 'cpu':
+            raise ValueError('int8 quantization is only supported on CPU')
+        
+        cache_file = get_cache_dir() / 'models' / (
+            f"{Path(model_name).stem}-int8-{model_fingerprint(model_name)}"
+            f"-whisper{whisper.__version__}-torch{torch.__version__}.pt"
+        )
+        if cache_file.exists():
+            try:
+                # A pickled module written by this script, not a weights-only file
+                model = torch.load(cache_file, map_location='cpu', weights_only=False)
+                print(f"Loaded quantized model from cache: {cache_file}", file=sys.stderr)
+                return model
+            except Exception as e:
+                print(f"Ignoring unreadable quantized model cache: {e}", file=sys.stderr)
+        
+        model = quantize_int8(whisper.load_model(model_name, device='cpu'))
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_file.with_suffix('.tmp')
+            torch.save(model, tmp_path)
+            os.replace(tmp_path, cache_file)
+        except OSError as e:
+            print(f"Could not cache quantized model: {e}", file=sys.stderr)
+        return model
+
+def model_fingerprint(model_name):
+    """
+    Identify the checkpoint behind a Whisper model name
+    
+    Official model names map to the SHA-256 embedded in their download URL;
+    local checkpoint paths use their size and modification time.
+    
+    Returns:
+        str: Short identifier that changes whenever the weights do
+    """
+    import hashlib
+    try:
+        import whisper
+        url = whisper._MODELS.get(model_name)
+    except (ImportError, AttributeError):
+        url = None
+    if url:
+        return url.split('/')[-2][:12]
+    
+    try:
+        stat = os.stat(model_name)
+        raw = f"{os.path.abspath(model_name)}:{stat.st_size}:{stat.st_mtime}"
+    except OSError:
+        raw = model_name
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:12]
+
+def quantize_int8(model):
+    """
+    Apply int8 dynamic quantization to a Whisper model's linear layers
+    
+    Whisper uses its own nn.Linear subclass, which torch's quantizer does
+    not match, so those layers are first swapped for plain nn.Linear
+    modules sharing the same weights.
+    
+    Args:
+        model: openai-whisper model on CPU
+    
+    Returns:
+        Quantized model
+    """
+    import torch
+    from torch import nn
+    
+    def plain_linears(module):
+        for name, child in module.named_children():
+            if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+            else:
+                plain_linears(child)
+    
+    plain_linears(model)
+    quantization = getattr(torch, 'ao', torch).quantization
+    print("Quantizing linear layers to int8", file=sys.stderr)
+    return quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+class FasterWhisperModel:
+    """Adapter giving a faster-whisper model Whisper's transcribe() interface"""
+    
+    # Whisper transcribe() options that faster-whisper understands
+    SUPPORTED_OPTIONS = ('language', 'initial_prompt', 'temperature', 'beam_size',
+                         'condition_on_previous_text')
+    
+    def __init__(self, model, memory_mb):
+        self.model = model
+        self.memory_mb = memory_mb
+    
+    def transcribe(self, audio, **options):
+        options = {key: value for key, value in options.items() if key in self.SUPPORTED_OPTIONS}
+        segments, info = self.model.transcribe(audio, **options)
+        # faster-whisper yields segments lazily; decoding happens here
+        segments = [
+            {'start': seg.start, 'end': seg.end, 'text': seg.text}
+            for seg in segments
+        ]
+        return {
+            'text': ''.join(seg['text'] for seg in segments),
+            'language': info.language,
+            'segments': segments
+        }
+
+class FasterWhisperBackend:
+    """CTranslate2 implementation (faster-whisper), int8 by default on CPU"""
+    
+    name = 'faster-whisper'
+    display_name = 'faster-whisper'
+    module = 'faster_whisper'
+    package = 'faster-whisper'
+    
+    BYTES_PER_PARAM = {'int8': 1, 'int8_float16': 1, 'float16': 2, 'float32': 4}
+    
+    def default_dtype(self, device):
+        return 'int8' if device == 'cpu' else 'float16'
+    
+    def load(self, model_name, device, dtype):
+        """
+        Load a model
+        
+        Returns:
+            FasterWhisperModel: Adapter with Whisper's transcribe() interface
+        """
+        from faster_whisper import WhisperModel
+        model = WhisperModel(model_name, device=device, compute_type=dtype)
+        memory_mb = WHISPER_PARAMS_M.get(model_name, 0) * self.BYTES_PER_PARAM.get(dtype, 4)
+        return FasterWhisperModel(model, memory_mb * 1e6 / (1024 * 1024))
+
+BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend(),
+    FasterWhisperBackend.name: FasterWhisperBackend()
+}
+
+class ModelRegistry:
+    """
+    In-process cache of loaded Whisper models with LRU eviction
+    
+    Models are keyed by (backend, name, device, dtype). When the estimated size of
+    all resident models exceeds the memory budget, the least recently used
+    ones are dropped; the most recently requested model is always kept.
+    """
+    
+    def __init__(self, max_memory_mb=DEFAULT_MODEL_CACHE_MB):
+        self.max_memory_mb = max_memory_mb
+        self._models = OrderedDict()
+        self._sizes = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, model_name="base", device=None, dtype=None, backend=None):
+        """
+        Return a loaded model, loading it on a cache miss
+        
+        Args:
+            model_name (str): Whisper model name
+            device (str): Torch device ('cpu', 'cuda'); auto-detect if None
+            dtype (str): Weight dtype (e.g. 'float32', 'float16', 'int8');
+                the backend's default for the device if None
+            backend (str): Backend name; DEFAULT_BACKEND if None
+        
+        Returns:
+            Loaded model with Whisper's transcribe() interface
+        """
+        key = self.resolve(model_name, device, dtype, backend)
+        backend, model_name, device, dtype = key
+        
+        model = self._models.get(key)
+        if model is not None:
+            self.hits += 1
+            self._models.move_to_end(key)
+            return model
+        
+        self.misses += 1
+        print(f"Loading Whisper model: {model_name} ({backend}, {device}, {dtype})", file=sys.stderr)
+        model = BACKENDS[backend].load(model_name, device, dtype)
+        self._models[key] = model
+        self._sizes[key] = estimate_model_size_mb(model)
+        self._evict()
+        return model
+    
+    def _evict(self):
+        while len(self._models) > 1 and self.memory_mb() > self.max_memory_mb:
+            key, _ = self._models.popitem(last=False)
+            self._sizes.pop(key, None)
+            self.evictions += 1
+            print(f"Evicted Whisper model from cache: {key}", file=sys.stderr)
+    
+    def memory_mb(self):
+        """Estimated memory held by resident models, in MB"""
+        return sum(self._sizes.values())
+    
+    @staticmethod
+    def resolve(model_name="base", device=None, dtype=None, backend=None):
+        """
+        Fill in the defaults get() would use
+        
+        Returns:
+            tuple: (backend, model_name, device, dtype) registry key
+        """
+        backend = backend or DEFAULT_BACKEND
+        # Dynamic int8 quantization targets CPU inference
+        device = resolve_device(device or ('cpu' if dtype == 'int8' else None))
+        dtype = dtype or BACKENDS[backend].default_dtype(device)
+        return (backend, model_name, device, dtype)
+    
+    def clear(self):
+        """Drop every resident model"""
+        self._models.clear()
+        self._sizes.clear()
+    
+    def stats(self):
+        """
+        Report cache statistics
+        
+        Returns:
+            dict: Hit/miss counters and the resident models
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'memory_mb': round(self.memory_mb(), 1),
+            'max_memory_mb': self.max_memory_mb,
+            'models': [
+                {'backend': backend, 'name': name, 'device': device, 'dtype': dtype}
+                for backend, name, device, dtype in self._models
+            ]
+        }
+
+def resolve_device(device=None):
+    """Resolve the torch device Whisper would pick when none is given"""
+    if device:
+        return device
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except ImportError:
+        return 'cpu'
+
+def parse_cpu_list(spec):
+    """
+    Parse a CPU list such as '0-3,6' into a set of CPU indices
+    
+    Args:
+        spec (str): Comma-separated CPU numbers and inclusive ranges
+    
+    Returns:
+        set: CPU indices
+    """
+    cpus = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.update(range(int(first), int(last or first) + 1))
+    if not cpus:
+        raise ValueError(f'Empty CPU list: {spec!r}')
+    return cpus
+
+def available_cpus():
+    """Number of CPUs this process may run on (respects affinity)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def pool_size(workers):
+    """
+    Cap a worker count at the number of available CPUs
+    
+    Each worker runs at least one compute thread, so more workers than CPUs
+    would oversubscribe the machine.
+    
+    Args:
+        workers (int): Requested number of worker processes
+    
+    Returns:
+        int: Number of workers to start
+    """
+    cpus = available_cpus()
+    if workers > cpus:
+        print(f"Using {cpus} workers instead of {workers}: only {cpus} CPUs are available",
+              file=sys.stderr)
+        return cpus
+    return workers
+
+def worker_threads(workers, threads=None):
+    """
+    Intra-op threads for each worker of a pool
+    
+    Args:
+        workers (int): Number of worker processes
+        threads (int): Requested threads per worker (optional)
+    
+    Returns:
+        int: threads if given, otherwise an even share of the available
+            CPUs so the pool as a whole does not oversubscribe them
+    """
+    cpus = available_cpus()
+    if threads:
+        if threads * workers > cpus:
+            print(f"Warning: {workers} workers x {threads} threads exceeds the {cpus} "
+                  f"available CPUs", file=sys.stderr)
+        return threads
+    return max(1, cpus // max(1, workers))
+
+def configure_threads(threads=None, interop_threads=None, cpu_affinity=None):
+    """
+    Limit the CPU resources used by inference in this process
+    
+    Must run before the first model is loaded: thread pools are sized when
+    torch (or CTranslate2) first starts them. Worker processes inherit the
+    CPU affinity and thread environment variables set here.
+    
+    Args:
+        threads (int): Intra-op threads (optional, library default if None)
+        interop_threads (int): Inter-op threads (optional)
+        cpu_affinity (str or set): CPUs to pin this process to, e.g. '0-3'
+            (optional)
+    """
+    if cpu_affinity:
+        cpus = parse_cpu_list(cpu_affinity) if isinstance(cpu_affinity, str) else set(cpu_affinity)
+        try:
+            if hasattr(os, 'sched_setaffinity'):
+                os.sched_setaffinity(0, cpus)
+            else:
+                import psutil
+                psutil.Process().cpu_affinity(sorted(cpus))
+            print(f"Pinned to CPUs: {sorted(cpus)}", file=sys.stderr)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"Could not set CPU affinity: {e}", file=sys.stderr)
+    
+    if threads:
+        # Read by OpenMP/MKL and by CTranslate2 when faster-whisper is used
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+        os.environ['MKL_NUM_THREADS'] = str(threads)
+    
+    if not threads and not interop_threads:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    if threads:
+        torch.set_num_threads(threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            # Only allowed before any inter-op parallel work has started
+            print(f"Could not set inter-op threads: {e}", file=sys.stderr)
+
+def estimate_model_size_mb(model):
+    """Estimate the memory held by a model's weights and buffers, in MB"""
+    if hasattr(model, 'memory_mb'):
+        return model.memory_mb
+    try:
+        state = model.state_dict()
+    except AttributeError:
+        return 0.0
+    
+    # Quantized layers keep their packed weights in tuples
+    def tensor_bytes(value):
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        if hasattr(value, 'numel') and hasattr(value, 'element_size'):
+            return value.numel() * value.element_size()
+        return 0
+    
+    return sum(tensor_bytes(value) for value in state.values()) / (1024 * 1024)
+
+# Shared registry used by every transcription in this process
+model_registry = ModelRegistry()
+
+def load_model(model_name="base", device=None, dtype=None, backend=None):
+    """
+    Load a Whisper model through the shared model registry
+    
+    Args:
+        model_name (str): Whisper model to load
+        device (str): Torch device (optional, auto-detect if None)
+        dtype (str): Weight dtype (optional, backend default if None)
+        backend (str): Backend name (optional, DEFAULT_BACKEND if None)
+    
+    Returns:
+        Loaded model with Whisper's transcribe() interface
+    """
+    return model_registry.get(model_name, device, dtype, backend)
+
+def transcribe_audio(audio_file_path, model_name="base", language=None, device=None, vad=False,
+                     backend=None, dtype=None, cache=None):
+    """
+    Transcribe audio file using OpenAI Whisper
+    
+    Args:
+        audio_file_path (str or numpy.ndarray): Path to the audio file, or
+            already decoded 16 kHz mono float32 samples
+        model_name (str): Whisper model to use ('tiny', 'base', 'small', 'medium', 'large')
+        language (str): Language code (optional, auto-detect if None)
+        device (str): Torch device (optional, auto-detect if None)
+        vad (bool): Drop non-speech regions before inference
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+        cache (TranscriptionCache): Result cache; the process-wide cache if
+            None, no caching if False
+    
+    Returns:
+        dict: Transcription result
+    """
+    try:
+        print(f"Starting transcription with model: {model_name}", file=sys.stderr)
+        
+        audio = audio_file_path
+        if isinstance(audio_file_path, str):
+            print(f"Transcribing file: {audio_file_path}", file=sys.stderr)
+            # Decode with the resolved ffmpeg (or PyAV) rather than letting
+            # Whisper look one up on PATH
+            audio = load_audio_file(audio_file_path)
+        else:
+            print(f"Transcribing {len(audio_file_path) / SAMPLE_RATE:.1f}s of decoded audio", file=sys.stderr)
+        
+        if cache is None:
+            cache = get_transcription_cache()
+        if cache:
+            key = cache.make_key(audio, model_name, language, device, vad, backend, dtype)
+            cached = cache.get(key)
+            if cached is not None:
+                print("Using cached transcription", file=sys.stderr)
+                cached['cache'] = dict(cache.stats(), hit=True)
+                return cached
+        
+        # Load the model (cached across calls in long-lived modes)
+        model = load_model(model_name, device, dtype, backend)
+        result = run_model(model, audio, language, vad)
+        print(f"Transcription completed. Text length: {len(result['text'])}", file=sys.stderr)
+        
+        if cache:
+            cache.put(key, result)
+            result['cache'] = dict(cache.stats(), hit=False)
+        return result
+        
+    except Exception as e:
+        print(f"Transcription error: {e}", file=sys.stderr)
+        return {
+            'success': False,
+            'error': str(e),
+            'text': '',
+            'language': 'unknown',
+            'segments': []
+        }
+
+def run_model(model, audio, language=None, vad=False, offset=0.0):
+    """
+    Run Whisper on decoded samples, optionally skipping silence first
+    
+    Args:
+        model: Loaded Whisper model
+        audio (numpy.ndarray): 16 kHz mono samples
+        language (str): Language code (optional, auto-detect if None)
+        vad (bool): Drop non-speech regions before inference
+        offset (float): Seconds added to every segment timestamp
+    
+    Returns:
+        dict: Transcription result
+    """
+    options = {}
+    if language:
+        options['language'] = language
+    
+    if not vad:
+        return format_result(model.transcribe(audio, **options), offset)
+    
+    regions = detect_speech(audio)
+    if not regions:
+        print("No speech detected, skipping inference", file=sys.stderr)
+        return {'success': True, 'text': '', 'language': language or 'unknown', 'segments': []}
+    
+    speech, mapping = remove_silence(audio, regions)
+    print(f"VAD kept {len(speech) / SAMPLE_RATE:.1f}s of {len(audio) / SAMPLE_RATE:.1f}s", file=sys.stderr)
+    result = format_result(model.transcribe(speech, **options))
+    for seg in result['segments']:
+        seg['start'] = map_timestamp(seg['start'], mapping) + offset
+        seg['end'] = map_timestamp(seg['end'], mapping, is_end=True) + offset
+    return result
+
+def _segments_from_tokens(tokenizer, tokens, duration):
+    """
+    Split decoded tokens into segments at Whisper's timestamp tokens
+    
+    Args:
+        tokenizer: Whisper tokenizer the tokens were decoded with
+        tokens (list): Decoded tokens including timestamp tokens
+        duration (float): Clip length, used to close an unterminated segment
+    
+    Returns:
+        list: Whisper-style segment dicts ('start', 'end', 'text')
+    """
+    segments = []
+    start = 0.0
+    text_tokens = []
+    for token in tokens:
+        if token < tokenizer.timestamp_begin:
+            text_tokens.append(token)
+            continue
+        time = (token - tokenizer.timestamp_begin) * BATCH_TIME_PRECISION
+        if text_tokens:
+            segments.append({'start': start, 'end': min(time, duration),
+                             'text': tokenizer.decode(text_tokens)})
+            text_tokens = []
+        start = time
+    if text_tokens:
+        segments.append({'start': start, 'end': duration, 'text': tokenizer.decode(text_tokens)})
+    return segments
+
+def run_model_batch(model, clips, language=None, vad=False):
+    """
+    Transcribe several short clips with one batched decoder pass
+    
+    Every clip is padded to Whisper's 30-second window and the log-mel
+    spectrograms are stacked into a single tensor, so the encoder and the
+    decoder each process the whole batch at once. Backends without a
+    batched decoder, and clips longer than one window, are transcribed one
+    at a time instead.
+    
+    Args:
+        model: Loaded Whisper model
+        clips (list): 16 kHz mono samples of each clip
+        language (str): Language code (optional, detected per clip if None)
+        vad (bool): Drop non-speech regions before inference
+    
+    Returns:
+        list: Transcription results in the order of clips
+    """
+    # Backends without Whisper's batched decoder take the regular path
+    if getattr(model, 'dims', None) is None:
+        return [run_model(model, audio, language, vad) for audio in clips]
+    
+    results = [None] * len(clips)
+    batch = []
+    for i, audio in enumerate(clips):
+        mapping = None
+        if vad:
+            regions = detect_speech(audio)
+            if not regions:
+                results[i] = {'success': True, 'text': '', 'language': language or 'unknown',
+                              'segments': []}
+                continue
+            audio, mapping = remove_silence(audio, regions)
+        
+        if len(audio) > BATCH_WINDOW_SECONDS * SAMPLE_RATE:
+            results[i] = run_model(model, clips[i], language, vad)
+        else:
+            batch.append((i, audio, mapping))
+    
+    if not batch:
+        return results
+    
+    import torch
+    import whisper
+    
+    mel = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels)
+        for _, audio, _ in batch
+    ]).to(model.device)
+    options = whisper.DecodingOptions(language=language, fp16=model.device.type != 'cpu')
+    decoded = whisper.decode(model, mel, options)
+    
+    for (i, audio, mapping), result in zip(batch, decoded):
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            model.is_multilingual, num_languages=model.num_languages,
+            language=result.language, task='transcribe'
+        )
+        duration = len(audio) / SAMPLE_RATE
+        formatted = format_result({
+            'text': result.text,
+            'language': result.language,
+            'segments': _segments_from_tokens(tokenizer, result.tokens, duration)
+        })
+        if mapping is not None:
+            for seg in formatted['segments']:
+                seg['start'] = map_timestamp(seg['start'], mapping)
+                seg['end'] = map_timestamp(seg['end'], mapping, is_end=True)
+        results[i] = formatted
+    return results
+
+def detect_speech(audio, frame_ms=VAD_FRAME_MS, padding_ms=VAD_PADDING_MS,
+                  min_silence_ms=VAD_MIN_SILENCE_MS):
+    """
+    Find regions of speech with WebRTC VAD, or an energy detector without it
+    
+    Args:
+        audio (numpy.ndarray): 16 kHz mono samples
+        frame_ms (int): Analysis frame length (10, 20 or 30 ms)
+        padding_ms (int): Audio kept on both sides of each speech region
+        min_silence_ms (int): Shorter pauses do not split a region
+    
+    Returns:
+        list: (start_sample, end_sample) speech regions in order
+    """
+    import numpy as np
+    
+    frame = SAMPLE_RATE * frame_ms // 1000
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    
+    try:
+        import webrtcvad
+        detector = webrtcvad.Vad(2)
+        pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype('<i2')
+        is_speech = np.array([detector.is_speech(row.tobytes(), SAMPLE_RATE) for row in pcm])
+    except ImportError:
+        # Energy detector with a threshold relative to the noise floor
+        energy_db = 10 * np.log10(np.square(frames).mean(axis=1) + 1e-10)
+        threshold = np.clip(np.percentile(energy_db, 10) + VAD_ENERGY_MARGIN_DB,
+                            VAD_MIN_THRESHOLD_DB, VAD_MAX_THRESHOLD_DB)
+        is_speech = energy_db > threshold
+    
+    # Turn frame flags into padded sample regions, merging short pauses
+    padding = SAMPLE_RATE * padding_ms // 1000
+    min_silence = SAMPLE_RATE * min_silence_ms // 1000
+    edges = np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * frame
+    ends = np.flatnonzero(edges == -1) * frame
+    
+    regions = []
+    for start, end in zip(starts, ends):
+        start = max(0, int(start) - padding)
+        end = min(len(audio), int(end) + padding)
+        if regions and start - regions[-1][1] < min_silence:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+def remove_silence(audio, regions):
+    """
+    Concatenate speech regions, keeping a map back to the original timeline
+    
+    Args:
+        audio (numpy.ndarray): 16 kHz mono samples
+        regions (list): (start_sample, end_sample) regions to keep
+    
+    Returns:
+        tuple: (speech samples, [(compact_start, original_start, duration)] in seconds)
+    """
+    import numpy as np
+    
+    mapping = []
+    position = 0
+    for start, end in regions:
+        mapping.append((position / SAMPLE_RATE, start / SAMPLE_RATE, (end - start) / SAMPLE_RATE))
+        position += end - start
+    speech = np.concatenate([audio[start:end] for start, end in regions])
+    return speech, mapping
+
+def map_timestamp(t, mapping, is_end=False):
+    """
+    Map a timestamp in silence-removed audio back to the original audio
+    
+    Args:
+        t (float): Seconds into the silence-removed audio
+        mapping (list): Map returned by remove_silence()
+        is_end (bool): Treat t as a segment end, so a time exactly on a
+            region boundary belongs to the region before it
+    
+    Returns:
+        float: Seconds into the original audio
+    """
+    import bisect
+    
+    starts = [compact for compact, _, _ in mapping]
+    index = (bisect.bisect_left(starts, t) if is_end else bisect.bisect_right(starts, t)) - 1
+    index = max(0, index)
+    compact, original, duration = mapping[index]
+    return original + min(max(t - compact, 0.0), duration)
+
+def format_result(result, offset=0.0):
+    """
+    Convert a Whisper result into the JSON schema returned by this script
+    
+    Args:
+        result (dict): Result of model.transcribe
+        offset (float): Seconds added to every segment timestamp
+    
+    Returns:
+        dict: Transcription result
+    """
+    return {
+        'success': True,
+        'text': result['text'].strip(),
+        'language': result.get('language', 'unknown'),
+        'segments': [
+            {
+                'start': seg['start'] + offset,
+                'end': seg['end'] + offset,
+                'text': seg['text'].strip()
+            }
+            for seg in result.get('segments', [])
+        ]
+    }
+
+class TranscriptionCache:
+    """
+    On-disk cache of transcription results, keyed by the decoded audio
+    
+    Keys hash the 16 kHz PCM together with everything that affects the
+    result: backend and its version, model name and checkpoint, device,
+    dtype, language and VAD. Upgrading a backend or replacing a checkpoint
+    therefore changes the key, and stale entries age out. The SQLite store
+    is trimmed by last access once it exceeds max_mb.
+    """
+    
+    def __init__(self, path=None, max_mb=DEFAULT_RESULT_CACHE_MB):
+        self.path = Path(path) if path else get_cache_dir() / 'transcripts.sqlite3'
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+    
+    def __getstate__(self):
+        # Worker processes open their own connection
+        state = dict(self.__dict__)
+        state['_db'] = None
+        return state
+    
+    def _connect(self):
+        import sqlite3
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), timeout=30)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS transcripts ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, '
+                'size INTEGER NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS transcripts_accessed ON transcripts (accessed)')
+            self._db.commit()
+        return self._db
+    
+    @staticmethod
+    def make_key(audio, model_name="base", language=None, device=None, vad=False,
+                 backend=None, dtype=None):
+        """Build the cache key for transcribing audio with these settings"""
+        import hashlib
+        import numpy as np
+        
+        backend, model_name, device, dtype = ModelRegistry.resolve(model_name, device, dtype, backend)
+        try:
+            from importlib.metadata import version
+            backend_version = version(BACKENDS[backend].package)
+        except Exception:
+            backend_version = 'unknown'
+        settings = [backend, backend_version, model_name, model_fingerprint(model_name),
+                    device, dtype, language, bool(vad)]
+        
+        digest = hashlib.sha256(json.dumps(settings).encode('utf-8'))
+        digest.update(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """
+        Look up a cached result
+        
+        Returns:
+            dict: Cached transcription result, or None on a miss
+        """
+        import sqlite3
+        try:
+            db = self._connect()
+            row = db.execute('SELECT result FROM transcripts WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                db.execute('UPDATE transcripts SET accessed = ? WHERE key = ?', (time.time(), key))
+                db.commit()
+                self.hits += 1
+                return json.loads(row[0])
+        except (sqlite3.Error, OSError) as e:
+            print(f"Transcription cache error: {e}", file=sys.stderr)
+        self.misses += 1
+        return None
+    
+    def put(self, key, result):
+        """Store a successful transcription result"""
+        import sqlite3
+        if not result.get('success'):
+            return
+        data = json.dumps({k: v for k, v in result.items() if k != 'cache'}, ensure_ascii=False)
+        try:
+            db = self._connect()
+            db.execute('INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)',
+                       (key, data, len(data), time.time()))
+            self._trim(db)
+            db.commit()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Transcription cache error: {e}", file=sys.stderr)
+    
+    def _trim(self, db):
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM transcripts').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the store fits again
+        excess = total - self.max_bytes
+        for key, size in db.execute('SELECT key, size FROM transcripts ORDER BY accessed').fetchall():
+            db.execute('DELETE FROM transcripts WHERE key = ?', (key,))
+            excess -= size
+            if excess <= 0:
+                break
+    
+    def stats(self):
+        """
+        Report cache statistics
+        
+        Returns:
+            dict: Hit/miss counters and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+    
+    def close(self):
+        """Close the SQLite store"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+_default_result_cache = None
+
+def get_transcription_cache():
+    """
+    Return the process-wide transcription cache, creating it on first use
+    
+    Returns:
+        TranscriptionCache: The cache, or False if caching is disabled
+    """
+    global _default_result_cache
+    if _default_result_cache is None:
+        _default_result_cache = TranscriptionCache()
+    return _default_result_cache
+
+def configure_transcription_cache(enabled=True, max_mb=DEFAULT_RESULT_CACHE_MB):
+    """Replace the process-wide transcription cache (disable it if not enabled)"""
+    global _default_result_cache
+    _default_result_cache = TranscriptionCache(max_mb=max_mb) if enabled else False
+
+def _ffmpeg_candidates():
+    """Candidate ffmpeg executables, in order of preference"""
+    candidates = []
+    if os.environ.get('HEARAI_FFMPEG'):
+        candidates.append(os.environ['HEARAI_FFMPEG'])
+    
+    # Bundled FFmpeg next to the python/ directory, as used by main.js
+    app_dir = Path(__file__).resolve().parent.parent
+    for name in ('ffmpeg.exe', 'ffmpeg'):
+        bundled = app_dir / 'ffmpeg' / name
+        if bundled.exists():
+            candidates.append(str(bundled))
+    
+    system = shutil.which('ffmpeg')
+    if system:
+        candidates.append(system)
+    return candidates
+
+def _probe_ffmpeg(path):
+    """
+    Run `ffmpeg -version` once and extract its version and capabilities
+    
+    Returns:
+        dict: Tool info, or None if the executable does not work
+    """
+    try:
+        result = subprocess.run([path, '-hide_banner', '-version'],
+                                capture_output=True, text=True, timeout=15)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    
+    lines = result.stdout.splitlines()
+    version = lines[0].split(' ')[2] if lines and len(lines[0].split(' ')) > 2 else 'unknown'
+    configuration = next((line for line in lines if line.startswith('configuration:')), '')
+    return {
+        'path': path,
+        'version': version,
+        'capabilities': sorted(
+            flag[len('--enable-'):] for flag in configuration.split()
+            if flag.startswith('--enable-')
+        )
+    }
+
+def _read_tool_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_tool_cache(cache_file, cache):
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_file.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        print(f"Could not write tool cache: {e}", file=sys.stderr)
+
+def find_ffmpeg(use_disk_cache=None):
+    """
+    Resolve and validate ffmpeg once per process
+    
+    The first working candidate is probed with `ffmpeg -version`. The result
+    is kept for the lifetime of the process and, unless disabled, stored in
+    tools.json in the cache directory keyed by the executable's size and
+    mtime, so later processes skip the probe entirely.
+    
+    Args:
+        use_disk_cache (bool): Use the on-disk cache; defaults to True unless
+            HEARAI_TOOL_CACHE=0
+    
+    Returns:
+        dict: {'path', 'version', 'capabilities'}, or None if ffmpeg is missing
+    """
+    global _ffmpeg_info
+    if _ffmpeg_info is not None:
+        return _ffmpeg_info or None
+    
+    if use_disk_cache is None:
+        use_disk_cache = os.environ.get('HEARAI_TOOL_CACHE', '1') != '0'
+    cache_file = get_cache_dir() / 'tools.json'
+    cache = _read_tool_cache(cache_file) if use_disk_cache else {}
+    
+    for candidate in _ffmpeg_candidates():
+        try:
+            stat = os.stat(candidate)
+        except OSError:
+            continue
+        
+        cached = cache.get(candidate)
+        if cached and cached.get('size') == stat.st_size and cached.get('mtime') == stat.st_mtime:
+            _ffmpeg_info = cached['info']
+            return _ffmpeg_info
+        
+        info = _probe_ffmpeg(candidate)
+        if info is None:
+            continue
+        
+        if use_disk_cache:
+            cache[candidate] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'info': info}
+            _write_tool_cache(cache_file, cache)
+        _ffmpeg_info = info
+        return info
+    
+    _ffmpeg_info = False
+    return None
+
+def _ffmpeg_decode(input_arg, input_data=None):
+    """
+    Decode audio to 16 kHz mono float32 samples with a single ffmpeg process
+    
+    Args:
+        input_arg (str): ffmpeg input ('pipe:0' or a file path)
+        input_data (bytes): Data written to ffmpeg's stdin (optional)
+    
+    Returns:
+        numpy.ndarray: Decoded samples in [-1, 1]
+    
+    Raises:
+        FileNotFoundError: If ffmpeg is not available
+        RuntimeError: If ffmpeg fails to decode the input
+    """
+    import numpy as np
+    
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise FileNotFoundError('ffmpeg not found')
+    
+    cmd = [
+        ffmpeg['path'], '-nostats', '-loglevel', 'error',
+        '-i', input_arg,
+        '-vn',  # No video
+        '-f', 's16le',  # Raw 16-bit PCM, same as Whisper's own loader
+        '-ac', '1',  # Mono
+        '-ar', str(SAMPLE_RATE),
+        'pipe:1'
+    ]
+    
+    if input_data is None:
+        # Keep ffmpeg off our own stdin, which carries requests in --serve mode
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True)
+    else:
+        result = subprocess.run(cmd, input=input_data, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode audio: {result.stderr.decode(errors='replace').strip()}")
+    
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
+def _pyav_decode(source):
+    """
+    Decode audio to 16 kHz mono float32 samples in-process with PyAV
+    
+    Used when ffmpeg is not installed. PyAV ships its own libav libraries,
+    so WebM/Opus is demuxed and resampled without any subprocess.
+    
+    Args:
+        source (str or bytes): File path or encoded audio data
+    
+    Returns:
+        numpy.ndarray: Decoded samples in [-1, 1]
+    
+    Raises:
+        ImportError: If PyAV is not installed
+    """
+    import io
+    import av
+    import numpy as np
+    
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    
+    resampler = av.AudioResampler(format='flt', layout='mono', rate=SAMPLE_RATE)
+    chunks = []
+    with av.open(source) as container:
+        stream = next((s for s in container.streams if s.type == 'audio'), None)
+        if stream is None:
+            raise RuntimeError('No audio stream found')
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        # Flush samples buffered inside the resampler
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray().reshape(-1))
+    
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+def _decode(input_arg, input_data=None):
+    """Decode with ffmpeg, falling back to PyAV when ffmpeg is missing"""
+    try:
+        return _ffmpeg_decode(input_arg, input_data)
+    except FileNotFoundError:
+        pass
+    
+    try:
+        return _pyav_decode(input_arg if input_data is None else input_data)
+    except ImportError:
+        raise FileNotFoundError(
+            'No audio decoder available. Install FFmpeg, or PyAV with: pip install av'
+        )
+
+def parse_wav_header(path):
+    """
+    Read the format and data location of a RIFF/WAVE file
+    
+    Args:
+        path (str): File path
+    
+    Returns:
+        dict: 'format' (1 = PCM, 3 = float), 'channels', 'sample_rate',
+            'bits', 'data_offset' and 'data_size' (bytes), or None if the
+            file is not a WAV file this parser understands
+    """
+    import struct
+    
+    try:
+        with open(path, 'rb') as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+                return None
+            file_size = os.fstat(f.fileno()).st_size
+            
+            header = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+                
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                    if len(fmt) < 16:
+                        return None
+                    audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                    # WAVE_FORMAT_EXTENSIBLE keeps the real format in its sub-format GUID
+                    if audio_format == 0xFFFE and len(fmt) >= 26:
+                        audio_format = struct.unpack('<H', fmt[24:26])[0]
+                    header = {
+                        'format': audio_format,
+                        'channels': channels,
+                        'sample_rate': sample_rate,
+                        'bits': bits
+                    }
+                elif chunk_id == b'data':
+                    if header is None:
+                        return None
+                    data_offset = f.tell()
+                    # Recorders that stream the file may leave the size unset
+                    available = file_size - data_offset
+                    if chunk_size == 0 or chunk_size == 0xFFFFFFFF or chunk_size > available:
+                        chunk_size = available
+                    header['data_offset'] = data_offset
+                    header['data_size'] = chunk_size
+                    return header
+                else:
+                    f.seek(chunk_size, os.SEEK_CUR)
+                
+                # Chunks are padded to an even length
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+def is_pcm_wav(header):
+    """Whether a parse_wav_header() result is already 16 kHz mono s16le"""
+    return (header is not None and header['format'] == 1 and header['channels'] == 1
+            and header['sample_rate'] == SAMPLE_RATE and header['bits'] == 16)
+
+def open_pcm_wav(path, header=None, start=0, end=None):
+    """
+    Memory-map the samples of a WAV file that is already 16 kHz mono s16le
+    
+    Args:
+        path (str): File path
+        header (dict): parse_wav_header() result (optional, parsed if None)
+        start (int): First sample to map
+        end (int): Sample to stop at (optional, end of data if None)
+    
+    Returns:
+        numpy.memmap: int16 samples, or None if the file needs decoding
+    """
+    import numpy as np
+    
+    header = header or parse_wav_header(path)
+    if not is_pcm_wav(header):
+        return None
+    
+    n_samples = header['data_size'] // 2
+    end = n_samples if end is None else min(end, n_samples)
+    if end <= start:
+        return np.zeros(0, dtype='<i2')
+    return np.memmap(path, dtype='<i2', mode='r', offset=header['data_offset'] + 2 * start,
+                     shape=(end - start,))
+
+def load_audio_file(audio_file_path):
+    """
+    Decode an audio file to 16 kHz mono float32 samples
+    
+    WAV files that are already 16 kHz mono 16-bit PCM are read directly
+    through a memory map; everything else goes through ffmpeg (or PyAV).
+    
+    Args:
+        audio_file_path (str): Path to the audio file
+    
+    Returns:
+        numpy.ndarray: Decoded samples in [-1, 1]
+    
+    Raises:
+        FileNotFoundError: If neither ffmpeg nor PyAV is available
+    """
+    import numpy as np
+    
+    pcm = open_pcm_wav(audio_file_path)
+    if pcm is not None:
+        return pcm.astype(np.float32) / 32768.0
+    return _decode(audio_file_path)
+
+def resample_poly(audio, up, down):
+    """
+    Resample by the rational factor up/down with a polyphase FIR filter
+    
+    Uses scipy.signal.resample_poly when SciPy is installed. Otherwise the
+    same Kaiser-windowed low-pass filter is applied in NumPy, computing
+    only the output samples that are kept, a block at a time.
+    
+    Args:
+        audio (numpy.ndarray): 1-D float32 samples
+        up (int): Upsampling factor
+        down (int): Downsampling factor
+    
+    Returns:
+        numpy.ndarray: Resampled float32 samples
+    """
+    import numpy as np
+    
+    if up == down:
+        return audio.astype(np.float32, copy=False)
+    try:
+        from scipy.signal import resample_poly as scipy_resample_poly
+        return scipy_resample_poly(audio, up, down).astype(np.float32)
     except ImportError:
-        print("OpenAI Whisper not found. Please install it:", file=sys.stderr)
-        print("Run: pip install openai-whisper", file=sys.stderr)
-        print("Or use the install-python-deps.bat file", file=sys.stderr)
-        return False
+        pass
+    
+    # Low-pass at the lower of the two Nyquist rates, as scipy does
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    n = np.arange(2 * half_len + 1) - half_len
+    h = np.sinc(n / max_rate) * np.kaiser(2 * half_len + 1, 5.0)
+    h *= up / h.sum()
+    
+    # Split the filter into one set of taps per phase
+    taps = -(-len(h) // up)
+    phases = np.zeros((up, taps), dtype=np.float64)
+    for phase in range(up):
+        phase_taps = h[phase::up]
+        phases[phase, :len(phase_taps)] = phase_taps
+    
+    # Pad so every tap reads a valid (zero) sample past either end
+    padded = np.concatenate([np.zeros(taps, np.float64), audio.astype(np.float64),
+                             np.zeros(taps, np.float64)])
+    n_out = -(-len(audio) * up // down)
+    out = np.empty(n_out, dtype=np.float32)
+    block = 65536
+    for first in range(0, n_out, block):
+        positions = np.arange(first, min(first + block, n_out)) * down + half_len
+        base = positions // up + taps
+        index = base[:, None] - np.arange(taps)[None, :]
+        out[first:first + len(positions)] = (padded[index] * phases[positions % up]).sum(axis=1)
+    return out
 
-def transcribe_audio(audio_file_path, model_name="base", language=None):
+def decode_raw_pcm(data, sample_format='pcm_s16le', sample_rate=SAMPLE_RATE, channels=1):
     """
-    Transcribe audio file using OpenAI Whisper
+    Convert raw interleaved PCM to 16 kHz mono float32 samples without ffmpeg
     
     Args:
-        audio_file_path (str): Path to the audio file
-        model_name (str): Whisper model to use ('tiny', 'base', 'small', 'medium', 'large')
+        data (bytes): Raw PCM data
+        sample_format (str): 'pcm_s16le' or 'pcm_f32le'
+        sample_rate (int): Sample rate of the data
+        channels (int): Interleaved channel count
+    
+    Returns:
+        numpy.ndarray: Samples in [-1, 1]
+    """
+    import math
+    import numpy as np
+    
+    if sample_rate <= 0 or channels <= 0:
+        raise ValueError('Sample rate and channel count must be positive')
+    
+    if sample_format == 'pcm_s16le':
+        audio = np.frombuffer(data, dtype='<i2', count=len(data) // 2).astype(np.float32) / 32768.0
+    elif sample_format == 'pcm_f32le':
+        audio = np.frombuffer(data, dtype='<f4', count=len(data) // 4).astype(np.float32)
+    else:
+        raise ValueError(f'Unsupported PCM format: {sample_format}')
+    
+    if channels > 1:
+        # Drop a trailing partial frame, then average the channels
+        frames = len(audio) // channels
+        audio = audio[:frames * channels].reshape(frames, channels).mean(axis=1, dtype=np.float32)
+    
+    if sample_rate != SAMPLE_RATE:
+        common = math.gcd(SAMPLE_RATE, sample_rate)
+        audio = resample_poly(audio, SAMPLE_RATE // common, sample_rate // common)
+    return audio
+
+def decode_audio_bytes(audio_data):
+    """
+    Decode in-memory audio to 16 kHz mono float32 samples through ffmpeg pipes
+    
+    The encoded data is written to ffmpeg's stdin and raw PCM is read back
+    from its stdout, so nothing touches the disk. Without ffmpeg the data is
+    decoded in-process with PyAV.
+    
+    Args:
+        audio_data (bytes): Encoded audio data (e.g. WebM/Opus)
+    
+    Returns:
+        numpy.ndarray: Decoded samples in [-1, 1]
+    
+    Raises:
+        FileNotFoundError: If neither ffmpeg nor PyAV is available
+        RuntimeError: If ffmpeg fails to decode the data
+    """
+    return _decode('pipe:0', audio_data)
+
+def transcribe_bytes(audio_data, model_name="base", language=None, device=None, vad=False,
+                     backend=None, dtype=None, cache=None):
+    """
+    Transcribe in-memory WebM audio data
+    
+    Args:
+        audio_data (bytes): Raw WebM audio data
+        model_name (str): Whisper model to use
         language (str): Language code (optional, auto-detect if None)
+        device (str): Torch device (optional, auto-detect if None)
+        vad (bool): Drop non-speech regions before inference
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+        cache (TranscriptionCache): Result cache; the process-wide cache if
+            None, no caching if False
     
     Returns:
         dict: Transcription result
     """
-    try:
-        print(f"Starting transcription with model: {model_name}", file=sys.stderr)
-        import whisper
+    audio = decode_audio_bytes(audio_data)
+    return transcribe_audio(audio, model_name, language, device, vad, backend, dtype, cache)
+
+def find_split_points(audio, chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                      search_seconds=SILENCE_SEARCH_SECONDS):
+    """
+    Pick chunk boundaries at the quietest point near every chunk_seconds
+    
+    Args:
+        audio (numpy.ndarray): 16 kHz mono samples
+        chunk_seconds (float): Target chunk length
+        search_seconds (float): Window around each target boundary searched
+            for silence
+    
+    Returns:
+        list: Boundary sample indices, starting with 0 and ending with len(audio)
+    """
+    import numpy as np
+    
+    # Energy of 100 ms frames
+    frame = SAMPLE_RATE // 10
+    n_frames = len(audio) // frame
+    energy = np.square(audio[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+    
+    chunk_frames = int(chunk_seconds * 10)
+    search_frames = int(search_seconds * 10 / 2)
+    points = [0]
+    target = chunk_frames
+    while target < n_frames - search_frames:
+        lo = max(points[-1] // frame + 1, target - search_frames)
+        hi = min(n_frames, target + search_frames)
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        points.append(quietest * frame)
+        target = quietest + chunk_frames
+    points.append(len(audio))
+    return points
+
+def iter_wav_windows(path, chunk_seconds=LOW_MEMORY_CHUNK_SECONDS,
+                     search_seconds=SILENCE_SEARCH_SECONDS):
+    """
+    Read a 16 kHz mono s16le WAV file one window at a time
+    
+    Only the current window is mapped and converted to float32, and the map
+    is dropped before the next one, so memory use does not grow with the
+    length of the file. Windows end at the quietest 100 ms frame within
+    search_seconds of chunk_seconds.
+    
+    Args:
+        path (str): WAV file path
+        chunk_seconds (float): Target window length
+        search_seconds (float): Span around the target end searched for silence
+    
+    Yields:
+        tuple: (offset in seconds, float32 samples of the window)
+    
+    Raises:
+        ValueError: If the file is not 16 kHz mono 16-bit PCM WAV
+    """
+    import numpy as np
+    
+    header = parse_wav_header(path)
+    if not is_pcm_wav(header):
+        raise ValueError(f'Not a 16 kHz mono 16-bit PCM WAV file: {path}')
+    
+    total = header['data_size'] // 2
+    frame = SAMPLE_RATE // 10
+    chunk = int(chunk_seconds * SAMPLE_RATE)
+    half_search = int(search_seconds * SAMPLE_RATE / 2)
+    
+    start = 0
+    while start < total:
+        end = min(total, start + chunk + half_search)
+        pcm = open_pcm_wav(path, header, start, end)
+        window = pcm.astype(np.float32) / 32768.0
+        del pcm
         
-        # Load the model
-        print(f"Loading Whisper model: {model_name}", file=sys.stderr)
-        model = whisper.load_model(model_name)
+        if end < total:
+            # Cut at the quietest frame around the target length
+            lo = max(frame, chunk - half_search) // frame
+            n_frames = len(window) // frame
+            energy = np.square(window[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+            window = window[:(lo + int(np.argmin(energy[lo:]))) * frame]
         
-        # Transcribe
-        options = {}
-        if language:
-            options['language'] = language
+        yield start / SAMPLE_RATE, window
+        start += len(window)
+
+def transcribe_low_memory(audio_file_path, model_name="base", language=None, device=None,
+                          vad=False, backend=None, dtype=None):
+    """
+    Transcribe a long recording without holding all of its samples in memory
+    
+    16 kHz mono s16le WAV input is memory-mapped directly; anything else is
+    first converted to such a WAV file by ffmpeg, which streams it to disk.
+    Windows are then transcribed one after another (see iter_wav_windows).
+    
+    Args:
+        audio_file_path (str): Audio file path
+        model_name (str): Whisper model to use
+        language (str): Language code (optional, detected from the first
+            window with speech if None)
+        device (str): Torch device (optional, auto-detect if None)
+        vad (bool): Drop non-speech regions before inference
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+    
+    Returns:
+        dict: Transcription result with global segment timestamps
+    """
+    wav_path = audio_file_path
+    try:
+        if not is_pcm_wav(parse_wav_header(audio_file_path)):
+            ffmpeg = find_ffmpeg()
+            if ffmpeg is None:
+                raise FileNotFoundError('Low-memory mode needs ffmpeg for input other than 16 kHz mono WAV')
+            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_wav:
+                wav_path = tmp_wav.name
+            cmd = [
+                ffmpeg['path'], '-nostdin', '-nostats', '-loglevel', 'error',
+                '-i', audio_file_path,
+                '-ac', '1', '-ar', str(SAMPLE_RATE), '-c:a', 'pcm_s16le',
+                '-y', wav_path
+            ]
+            subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, check=True)
         
-        print(f"Transcribing file: {audio_file_path}", file=sys.stderr)
-        result = model.transcribe(audio_file_path, **options)
-        print(f"Transcription completed. Text length: {len(result['text'])}", file=sys.stderr)
+        model = load_model(model_name, device, dtype, backend)
+        detected_language = language
+        segments = []
+        for offset, window in iter_wav_windows(wav_path):
+            print(f"Transcribing window at {offset:.0f}s", file=sys.stderr)
+            result = run_model(model, window, detected_language, vad, offset)
+            # Keep the first detected language for the remaining windows
+            if not detected_language and result['segments']:
+                detected_language = result['language']
+            segments.extend(seg for seg in result['segments'] if seg['text'])
         
         return {
             'success': True,
-            'text': result['text'].strip(),
-            'language': result.get('language', 'unknown'),
-            'segments': [
-                {
-                    'start': seg['start'],
-                    'end': seg['end'],
-                    'text': seg['text'].strip()
-                }
-                for seg in result.get('segments', [])
-            ]
+            'text': ' '.join(seg['text'] for seg in segments),
+            'language': detected_language or 'unknown',
+            'segments': segments
         }
-        
+    
     except Exception as e:
         print(f"Transcription error: {e}", file=sys.stderr)
         return {
@@ -73,85 +1590,666 @@ def transcribe_audio(audio_file_path, model_name="base", language=None):
             'language': 'unknown',
             'segments': []
         }
+    
+    finally:
+        if wav_path != audio_file_path:
+            try:
+                os.unlink(wav_path)
+            except:
+                pass
+
+def _init_pool_worker(model_name, device, backend, dtype, threads=None):
+    """Process pool initializer: load this worker's own resident model"""
+    configure_threads(threads, 1)
+    load_model(model_name, device, dtype, backend)
+
+def _transcribe_chunk(model_name, device, backend, dtype, language, vad, audio, offset):
+    """Transcribe one long-form chunk and shift its segments to global time"""
+    model = load_model(model_name, device, dtype, backend)
+    return run_model(model, audio, language, vad, offset)
+
+def transcribe_batch(paths, model_name="base", language=None, device=None, vad=False,
+                     backend=None, dtype=None, cache=None):
+    """
+    Transcribe several short files with one batched decoder pass
+    
+    Args:
+        paths (list): Audio file paths
+        model_name (str): Whisper model to use
+        language (str): Language code (optional, detected per file if None)
+        device (str): Torch device (optional, auto-detect if None)
+        vad (bool): Drop non-speech regions before inference
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+        cache (TranscriptionCache): Result cache; the process-wide cache if
+            None, no caching if False
+    
+    Returns:
+        list: Transcription results in the order of paths
+    """
+    if len(paths) == 1:
+        return [transcribe_audio(paths[0], model_name, language, device, vad, backend, dtype, cache)]
+    
+    def failed(error):
+        return {'success': False, 'error': str(error), 'text': '', 'language': 'unknown'}
+    
+    if cache is None:
+        cache = get_transcription_cache()
+    
+    results = [None] * len(paths)
+    try:
+        clips = []
+        for i, path in enumerate(paths):
+            try:
+                audio = load_audio_file(path)
+            except Exception as e:
+                results[i] = failed(e)
+                continue
+            key = cache.make_key(audio, model_name, language, device, vad, backend, dtype) if cache else None
+            cached = cache.get(key) if cache else None
+            if cached is not None:
+                results[i] = dict(cached, cache=dict(cache.stats(), hit=True))
+            else:
+                clips.append((i, audio, key))
+        
+        if clips:
+            print(f"Batch transcription of {len(clips)} files", file=sys.stderr)
+            model = load_model(model_name, device, dtype, backend)
+            batch_results = run_model_batch(model, [audio for _, audio, _ in clips], language, vad)
+            for (i, _, key), result in zip(clips, batch_results):
+                if cache:
+                    cache.put(key, result)
+                    result['cache'] = dict(cache.stats(), hit=False)
+                results[i] = result
+    
+    except Exception as e:
+        print(f"Batch transcription error: {e}", file=sys.stderr)
+        results = [result or failed(e) for result in results]
+    
+    return results
+
+def _transcribe_file_batch(model_name, device, backend, dtype, language, vad, cache, paths):
+    """Transcribe one batch of files in a worker process"""
+    return transcribe_batch(paths, model_name, language, device, vad, backend, dtype, cache)
+
+def expand_inputs(inputs):
+    """
+    Expand input arguments into a list of audio files
+    
+    Args:
+        inputs (list): File paths, directories (searched for audio files,
+            non-recursively) and glob patterns
+    
+    Returns:
+        tuple: (file paths in argument order without duplicates, list of
+            directories and glob patterns that matched no files)
+    """
+    paths = []
+    unmatched = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(
+                os.path.join(item, name) for name in os.listdir(item)
+                if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS
+            )
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item))
+        else:
+            matches = [item]
+        if not matches:
+            unmatched.append(item)
+        paths.extend(matches)
+    return list(OrderedDict.fromkeys(paths)), unmatched
+
+def transcribe_files(paths, model_name="base", language=None, device=None, vad=False,
+                     backend=None, dtype=None, jobs=1, threads=None, batch_size=1, cache=None):
+    """
+    Transcribe many files, yielding each result as soon as it is ready
+    
+    Files are transcribed in batches of batch_size (see run_model_batch).
+    With jobs > 1 batches are spread over a process pool in which every
+    worker keeps its own model loaded, so batches arrive out of order;
+    results within a batch keep their input order.
+    
+    Args:
+        paths (list): Audio file paths
+        model_name (str): Whisper model to use
+        language (str): Language code (optional, auto-detect if None)
+        device (str): Torch device (optional, auto-detect if None)
+        vad (bool): Drop non-speech regions before inference
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+        jobs (int): Number of worker processes
+        threads (int): Intra-op threads per worker (optional, the available
+            CPUs split evenly between workers if None)
+        batch_size (int): Files decoded together in one batched pass
+        cache (TranscriptionCache): Result cache; the process-wide cache if
+            None, no caching if False
+    
+    Yields:
+        dict: Transcription result with the input path in 'file'
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    import multiprocessing
+    
+    def missing(path):
+        return {
+            'file': path,
+            'success': False,
+            'error': f'Input file not found: {path}',
+            'text': '',
+            'language': 'unknown'
+        }
+    
+    pending = []
+    for path in paths:
+        if os.path.exists(path):
+            pending.append(path)
+        else:
+            yield missing(path)
+    
+    batch_size = max(1, batch_size)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    jobs = pool_size(min(jobs, len(batches)))
+    if jobs <= 1:
+        for batch in batches:
+            results = transcribe_batch(batch, model_name, language, device, vad, backend, dtype,
+                                       cache)
+            for path, result in zip(batch, results):
+                yield {'file': path, **result}
+        return
+    
+    threads = worker_threads(jobs, threads)
+    print(f"Transcribing {len(pending)} files in {len(batches)} batches on {jobs} workers "
+          f"({threads} threads each)", file=sys.stderr)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                             initializer=_init_pool_worker,
+                             initargs=(model_name, device, backend, dtype, threads)) as pool:
+        futures = {
+            pool.submit(_transcribe_file_batch, model_name, device, backend, dtype,
+                        language, vad, cache, batch): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                error = {'success': False, 'error': str(e), 'text': '', 'language': 'unknown'}
+                results = [error] * len(batch)
+            for path, result in zip(batch, results):
+                yield {'file': path, **result}
+
+def stitch_segments(chunk_results, keep_ranges):
+    """
+    Merge per-chunk results, dropping duplicates from the overlaps
+    
+    Each chunk only contributes the segments whose midpoint falls inside its
+    own keep range; overlap text repeated at a boundary is dropped as well.
+    
+    Args:
+        chunk_results (list): format_result() dicts with global timestamps
+        keep_ranges (list): (start, end) seconds owned by each chunk
+    
+    Returns:
+        list: Segments in time order
+    """
+    segments = []
+    for result, (keep_start, keep_end) in zip(chunk_results, keep_ranges):
+        for seg in result['segments']:
+            midpoint = (seg['start'] + seg['end']) / 2
+            if not keep_start <= midpoint < keep_end:
+                continue
+            if segments and seg['text'] == segments[-1]['text'] and seg['start'] < segments[-1]['end']:
+                continue
+            segments.append(seg)
+    return segments
 
-def convert_webm_to_wav(webm_data, output_path):
+def transcribe_long(audio_file_path, model_name="base", language=None, device=None,
+                    workers=2, chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                    overlap_seconds=DEFAULT_CHUNK_OVERLAP, vad=False, backend=None,
+                    dtype=None, threads=None):
     """
-    Convert WebM audio data to WAV format for Whisper
+    Transcribe long audio as overlapping chunks across a process pool
+    
+    Audio is split on silence near every chunk_seconds, each chunk is
+    padded with overlap_seconds on both sides, and chunks are transcribed
+    in worker processes that each keep their own model loaded.
     
     Args:
-        webm_data (bytes): Raw WebM audio data
-        output_path (str): Output WAV file path
+        audio_file_path (str or numpy.ndarray): Audio file path or samples
+        model_name (str): Whisper model to use
+        language (str): Language code (optional, auto-detect if None)
+        device (str): Torch device (optional, auto-detect if None)
+        workers (int): Number of worker processes
+        chunk_seconds (float): Target chunk length
+        overlap_seconds (float): Audio shared with each neighbouring chunk
+        vad (bool): Drop non-speech regions of each chunk before inference
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+        threads (int): Intra-op threads per worker (optional, the available
+            CPUs split evenly between workers if None)
     
     Returns:
-        bool: Success status
+        dict: Transcription result with global segment timestamps
     """
     try:
-        import subprocess
+        from collections import Counter
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
         
-        # Write WebM data to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as tmp_webm:
-            tmp_webm.write(webm_data)
-            tmp_webm_path = tmp_webm.name
+        audio = audio_file_path
+        if isinstance(audio_file_path, str):
+            audio = load_audio_file(audio_file_path)
         
-        try:
-            # Check if FFmpeg is available
-            result = subprocess.run(['ffmpeg', '-version'], 
-                                  capture_output=True, text=True)
-            
-            # Convert WebM to WAV using FFmpeg
-            cmd = [
-                'ffmpeg', '-i', tmp_webm_path,
-                '-vn',  # No video
-                '-acodec', 'pcm_s16le',  # 16-bit PCM
-                '-ar', '16000',  # 16kHz sample rate
-                '-ac', '1',  # Mono
-                '-y',  # Overwrite output
-                output_path
+        points = find_split_points(audio, chunk_seconds)
+        workers = pool_size(workers)
+        if len(points) <= 2 or workers <= 1:
+            return transcribe_audio(audio, model_name, language, device, vad, backend, dtype)
+        
+        overlap = int(overlap_seconds * SAMPLE_RATE)
+        jobs = []
+        keep_ranges = []
+        for start, end in zip(points[:-1], points[1:]):
+            chunk_start = max(0, start - overlap)
+            chunk_end = min(len(audio), end + overlap)
+            jobs.append((audio[chunk_start:chunk_end], chunk_start / SAMPLE_RATE))
+            keep_ranges.append((start / SAMPLE_RATE, end / SAMPLE_RATE))
+        # The first and last chunks own everything before/after them
+        keep_ranges[0] = (float('-inf'), keep_ranges[0][1])
+        keep_ranges[-1] = (keep_ranges[-1][0], float('inf'))
+        
+        workers = min(workers, len(jobs))
+        threads = worker_threads(workers, threads)
+        print(f"Long-form transcription: {len(jobs)} chunks on {workers} workers "
+              f"({threads} threads each)", file=sys.stderr)
+        
+        # Spawn rather than fork: torch does not survive forking once initialised
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_pool_worker,
+                                 initargs=(model_name, device, backend, dtype, threads)) as pool:
+            futures = [
+                pool.submit(_transcribe_chunk, model_name, device, backend, dtype,
+                            language, vad, chunk, offset)
+                for chunk, offset in jobs
             ]
+            chunk_results = [future.result() for future in futures]
+        
+        segments = stitch_segments(chunk_results, keep_ranges)
+        languages = Counter(result['language'] for result in chunk_results)
+        return {
+            'success': True,
+            'text': ' '.join(seg['text'] for seg in segments if seg['text']),
+            'language': language or languages.most_common(1)[0][0],
+            'segments': segments
+        }
+        
+    except Exception as e:
+        print(f"Transcription error: {e}", file=sys.stderr)
+        return {
+            'success': False,
+            'error': str(e),
+            'text': '',
+            'language': 'unknown',
+            'segments': []
+        }
+
+def _read_exactly(stream, size):
+    """Read up to size bytes, returning less only at end of stream"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        data = stream.read(remaining)
+        if not data:
+            break
+        chunks.append(data)
+        remaining -= len(data)
+    return b''.join(chunks)
+
+def iter_stream_events(stream, model_name="base", language=None, device=None,
+                       step_seconds=DEFAULT_STREAM_STEP, window_seconds=DEFAULT_STREAM_WINDOW,
+                       vad=False, backend=None, dtype=None):
+    """
+    Transcribe a live 16 kHz mono s16le PCM stream with a sliding window
+    
+    Every step_seconds of new audio, the unfinalized buffer is transcribed.
+    Segments that end well before the buffer end (all but the last one) are
+    finalized and dropped from the buffer; the rest are reported as
+    provisional and re-decoded on the next pass. The buffer never grows
+    beyond window_seconds.
+    
+    Args:
+        stream: Binary file object (stdin or a FIFO)
+        model_name (str): Whisper model to use
+        language (str): Language code (optional, detected on the first pass)
+        device (str): Torch device (optional, auto-detect if None)
+        step_seconds (float): New audio between two passes
+        window_seconds (float): Longest unfinalized buffer
+        vad (bool): Skip passes over buffers without speech
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+    
+    Yields:
+        dict: {'type': 'partial' | 'final', 'start', 'end', 'text'} events,
+            then a single {'type': 'done', ...} event at end of stream
+    
+    Raises:
+        ValueError: If step_seconds is shorter than one sample
+    """
+    import numpy as np
+    
+    step_bytes = int(step_seconds * SAMPLE_RATE) * 2
+    if step_bytes < 2:
+        raise ValueError(f'step_seconds must cover at least one sample, got {step_seconds}')
+    window = int(window_seconds * SAMPLE_RATE)
+    model = load_model(model_name, device, dtype, backend)
+    
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_offset = 0.0
+    finalized = []
+    
+    while True:
+        data = _read_exactly(stream, step_bytes)
+        end_of_stream = len(data) < step_bytes
+        if len(data) % 2:
+            data = data[:-1]
+        if data:
+            samples = np.frombuffer(data, '<i2').astype(np.float32) / 32768.0
+            buffer = np.concatenate((buffer, samples))
+        
+        if len(buffer) and not (vad and not detect_speech(buffer)):
+            options = {}
+            if language:
+                options['language'] = language
+            if finalized:
+                # Keep wording consistent across window boundaries
+                options['initial_prompt'] = ' '.join(seg['text'] for seg in finalized[-3:])
+            result = model.transcribe(buffer, **options)
+            language = language or result.get('language')
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return True
+            segments = [
+                {
+                    'start': buffer_offset + seg['start'],
+                    'end': buffer_offset + seg['end'],
+                    'text': seg['text'].strip()
+                }
+                for seg in result.get('segments', [])
+                if seg['text'].strip()
+            ]
             
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # FFmpeg not available, try alternative approach
-            print("FFmpeg not found, trying alternative conversion...", file=sys.stderr)
+            buffer_end = buffer_offset + len(buffer) / SAMPLE_RATE
+            if end_of_stream:
+                done, pending = segments, []
+            else:
+                done = [
+                    seg for seg in segments[:-1]
+                    if seg['end'] < buffer_end - STREAM_FINALIZE_MARGIN
+                ]
+                pending = segments[len(done):]
+                # Buffer full: finalize everything but the newest segment
+                if len(buffer) >= window and not done and segments:
+                    if len(segments) > 1:
+                        done, pending = segments[:-1], segments[-1:]
+                    else:
+                        done, pending = segments, []
             
-            # For now, just copy the file and let Whisper handle it
-            # Whisper can handle various formats including WebM
-            import shutil
-            shutil.copy2(tmp_webm_path, output_path)
-            return True
+            for seg in done:
+                finalized.append(seg)
+                yield dict(seg, type='final')
+            for seg in pending:
+                yield dict(seg, type='partial')
             
-        finally:
-            # Cleanup temporary WebM file
-            try:
-                os.unlink(tmp_webm_path)
-            except:
-                pass
-                
-    except Exception as e:
-        print(f"Conversion error: {e}", file=sys.stderr)
-        return False
+            if done:
+                cut = int((done[-1]['end'] - buffer_offset) * SAMPLE_RATE)
+                cut = min(max(cut, 0), len(buffer))
+                buffer = buffer[cut:]
+                buffer_offset += cut / SAMPLE_RATE
+        
+        if len(buffer) > window:
+            # Nothing could be finalized; drop the oldest audio
+            excess = len(buffer) - window
+            buffer = buffer[excess:]
+            buffer_offset += excess / SAMPLE_RATE
+        
+        if end_of_stream:
+            break
+    
+    yield {
+        'type': 'done',
+        'success': True,
+        'text': ' '.join(seg['text'] for seg in finalized),
+        'language': language or 'unknown',
+        'segments': finalized
+    }
+
+def stream(model_name="base", language=None, input_path=None,
+           step_seconds=DEFAULT_STREAM_STEP, window_seconds=DEFAULT_STREAM_WINDOW, vad=False,
+           backend=None, dtype=None):
+    """
+    Run streaming transcription, writing one JSON event per line
+    
+    Args:
+        model_name (str): Whisper model to use
+        language (str): Language code (optional)
+        input_path (str): FIFO or file to read PCM from (stdin if None)
+        step_seconds (float): New audio between two passes
+        window_seconds (float): Longest unfinalized buffer
+        vad (bool): Skip passes over buffers without speech
+        backend (str): Transcription backend (optional, DEFAULT_BACKEND if None)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+    
+    Returns:
+        int: Exit code
+    """
+    load_model(model_name, dtype=dtype, backend=backend)
+    print(json.dumps({'ready': True, 'model': model_name}), flush=True)
+    
+    source = open(input_path, 'rb') if input_path else sys.stdin.buffer
+    try:
+        for event in iter_stream_events(source, model_name, language, None,
+                                        step_seconds, window_seconds, vad, backend, dtype):
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+    finally:
+        if input_path:
+            source.close()
+    return 0
+
+def handle_serve_request(request, default_model="base", default_language=None,
+                         default_backend=None, default_dtype=None):
+    """
+    Handle a single --serve request
+    
+    Args:
+        request (dict): Parsed request. Either 'path' (audio file path) or
+            'audio' (base64-encoded WebM data) must be set; 'model',
+            'language', 'device', 'backend' and 'dtype' override the server
+            defaults and 'vad' enables silence skipping.
+            {"command": "stats"} returns model and result cache statistics instead.
+        default_model (str): Model used when the request does not name one
+        default_language (str): Language used when the request does not name one
+        default_backend (str): Backend used when the request does not name one
+        default_dtype (str): Weight dtype used when the request does not name one
+    
+    Returns:
+        dict: Transcription result
+    """
+    if request.get('command') == 'stats':
+        result_cache = get_transcription_cache()
+        return {
+            'success': True,
+            'model_cache': model_registry.stats(),
+            'result_cache': result_cache.stats() if result_cache else None
+        }
+    
+    model_name = request.get('model') or default_model
+    language = request.get('language') or default_language
+    device = request.get('device')
+    backend = request.get('backend') or default_backend
+    dtype = request.get('dtype') or default_dtype
+    vad = bool(request.get('vad'))
+    
+    if request.get('path'):
+        if not os.path.exists(request['path']):
+            return {
+                'success': False,
+                'error': f"Input file not found: {request['path']}",
+                'text': '',
+                'language': 'unknown',
+                'segments': []
+            }
+        return transcribe_audio(request['path'], model_name, language, device, vad, backend, dtype)
+    
+    if request.get('audio'):
+        audio_data = base64.b64decode(request['audio'])
+        return transcribe_bytes(audio_data, model_name, language, device, vad, backend, dtype)
+    
+    return {
+        'success': False,
+        'error': "Request must contain 'path' or 'audio'",
+        'text': '',
+        'language': 'unknown',
+        'segments': []
+    }
+
+def serve(model_name="base", language=None, backend=None, dtype=None):
+    """
+    Run a persistent transcription loop over stdin/stdout
+    
+    The model is loaded once up front. Each stdin line is a JSON request,
+    e.g. {"id": 1, "path": "clip.wav"} or {"id": 2, "audio": "<base64 webm>"},
+    and each request is answered with exactly one JSON line on stdout that
+    echoes the request 'id'.
+    
+    Args:
+        model_name (str): Whisper model to keep resident
+        language (str): Default language code (optional)
+        backend (str): Default transcription backend (optional)
+        dtype (str): Weight dtype, e.g. 'int8' (optional, backend default if None)
+    
+    Returns:
+        int: Exit code
+    """
+    load_model(model_name, dtype=dtype, backend=backend)
+    print(json.dumps({'ready': True, 'model': model_name}), flush=True)
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            result = handle_serve_request(request, model_name, language, backend, dtype)
+        except Exception as e:
+            print(f"Serve request error: {e}", file=sys.stderr)
+            result = {
+                'success': False,
+                'error': str(e),
+                'text': '',
+                'language': 'unknown',
+                'segments': []
+            }
+        
+        result['id'] = request_id
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    
+    return 0
 
 def main():
     parser = argparse.ArgumentParser(description='Transcribe audio using OpenAI Whisper')
-    parser.add_argument('--input', '-i', help='Input audio file path')
+    parser.add_argument('--input', '-i', nargs='+',
+                       help='Input audio file path; several paths, a directory or a glob '
+                            'print one JSON line per file')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Worker processes for multi-file --input')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='Clips of up to 30 s decoded together in one batch (multi-file --input)')
     parser.add_argument('--model', '-m', default='base', 
                        choices=['tiny', 'base', 'small', 'medium', 'large'],
                        help='Whisper model size')
     parser.add_argument('--language', '-l', help='Language code (optional)')
+    parser.add_argument('--backend', '-b', default=DEFAULT_BACKEND, choices=sorted(BACKENDS),
+                       help='Transcription backend')
+    parser.add_argument('--quantize', choices=['int8'],
+                       help='Run on CPU with int8 weights (quantized once, then cached on disk)')
     parser.add_argument('--stdin', action='store_true', 
                        help='Read audio data from stdin')
+    parser.add_argument('--stdin-format', choices=['pcm_s16le', 'pcm_f32le'],
+                       help='Treat --stdin data as raw PCM in this format instead of a container')
+    parser.add_argument('--sample-rate', type=int,
+                       help=f'Sample rate of raw --stdin PCM (default: {SAMPLE_RATE})')
+    parser.add_argument('--channels', type=int,
+                       help='Interleaved channels of raw --stdin PCM, downmixed to mono (default: 1)')
+    parser.add_argument('--serve', action='store_true',
+                       help='Keep the model loaded and answer JSON requests, one per stdin line')
+    parser.add_argument('--model-cache-mb', type=float, default=DEFAULT_MODEL_CACHE_MB,
+                       help='Memory budget for models kept loaded in --serve mode (MB)')
+    parser.add_argument('--long-form', action='store_true',
+                       help='Split long audio on silence and transcribe chunks in parallel')
+    parser.add_argument('--low-memory', action='store_true',
+                       help='Transcribe a long --input file 30 s at a time from a memory map')
+    parser.add_argument('--workers', type=int, default=2,
+                       help='Worker processes for --long-form')
+    parser.add_argument('--chunk-seconds', type=float, default=DEFAULT_CHUNK_SECONDS,
+                       help='Target chunk length for --long-form (seconds)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Transcribe a live 16 kHz mono s16le PCM stream, emitting JSON events')
+    parser.add_argument('--stream-input',
+                       help='FIFO or file to read the --stream PCM from (default: stdin)')
+    parser.add_argument('--step', type=float, default=DEFAULT_STREAM_STEP,
+                       help='Seconds of new audio between --stream passes')
+    parser.add_argument('--window', type=float, default=DEFAULT_STREAM_WINDOW,
+                       help='Longest unfinalized --stream buffer (seconds)')
+    parser.add_argument('--vad', action='store_true',
+                       help='Skip silence before inference (uses webrtcvad when installed)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the transcription result cache')
+    parser.add_argument('--cache-size-mb', type=float, default=DEFAULT_RESULT_CACHE_MB,
+                       help='Disk budget for cached transcription results (MB)')
+    parser.add_argument('--threads', type=int,
+                       help='Intra-op CPU threads (per worker with --long-form or --jobs; '
+                            'default: available CPUs split between workers)')
+    parser.add_argument('--interop-threads', type=int,
+                       help='Inter-op CPU threads')
+    parser.add_argument('--cpu-affinity',
+                       help="Pin the process and its workers to these CPUs, e.g. '0-3,6'")
     
     args = parser.parse_args()
     
     # Validate arguments
-    if not args.stdin and not args.input:
-        parser.error('Either --input or --stdin must be specified')
+    if not args.stdin and not args.input and not args.serve and not args.stream:
+        parser.error('Either --input, --stdin, --serve or --stream must be specified')
+    
+    raw_pcm_options = (args.stdin_format, args.sample_rate, args.channels)
+    if not args.stdin and any(option is not None for option in raw_pcm_options):
+        parser.error('--stdin-format, --sample-rate and --channels require --stdin')
+    if (args.sample_rate is not None or args.channels is not None) and not args.stdin_format:
+        parser.error('--sample-rate and --channels require --stdin-format')
+    if args.sample_rate is not None and args.sample_rate <= 0:
+        parser.error('--sample-rate must be positive')
+    if args.channels is not None and args.channels <= 0:
+        parser.error('--channels must be positive')
+    if args.chunk_seconds <= 0:
+        parser.error('--chunk-seconds must be positive')
+    if args.step <= 0 or args.window <= 0:
+        parser.error('--step and --window must be positive')
+    
+    batch = args.input and (len(args.input) > 1 or os.path.isdir(args.input[0])
+                            or glob.has_magic(args.input[0]))
+    if batch and args.long_form:
+        parser.error('--long-form takes a single input file')
+    if args.low_memory and (batch or not args.input or args.serve or args.stream):
+        parser.error('--low-memory takes a single --input file')
+    if args.low_memory and args.long_form:
+        parser.error('--low-memory and --long-form cannot be combined')
     
     try:
         # Check and install requirements
-        if not install_requirements():
+        if not install_requirements(args.backend):
             result = {
                 'success': False,
                 'error': 'Failed to install required packages',
@@ -161,40 +2259,81 @@ def main():
             print(json.dumps(result))
             return 1
         
+        configure_threads(args.threads, args.interop_threads, args.cpu_affinity)
+        model_registry.max_memory_mb = args.model_cache_mb
+        configure_transcription_cache(not args.no_cache, args.cache_size_mb)
+        dtype = args.quantize
+        
+        if args.serve:
+            return serve(args.model, args.language, args.backend, dtype)
+        
+        if args.stream:
+            return stream(args.model, args.language, args.stream_input,
+                          args.step, args.window, args.vad, args.backend, dtype)
+        
+        if batch:
+            # One JSON line per file, printed as soon as that file is done
+            paths, unmatched = expand_inputs(args.input)
+            for pattern in unmatched:
+                result = {
+                    'file': pattern,
+                    'success': False,
+                    'error': f'No audio files match: {pattern}',
+                    'text': '',
+                    'language': 'unknown'
+                }
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+            if not paths:
+                return 1
+            
+            success = not unmatched
+            for result in transcribe_files(paths, args.model, args.language,
+                                           vad=args.vad, backend=args.backend, dtype=dtype,
+                                           jobs=args.jobs, threads=args.threads,
+                                           batch_size=args.batch_size,
+                                           cache=get_transcription_cache()):
+                success = success and result.get('success', False)
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+            return 0 if success else 1
+        
         if args.stdin:
             # Read binary data from stdin
             audio_data = sys.stdin.buffer.read()
-            
-            # Create temporary file for processing
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                temp_path = tmp_file.name
-            
-            try:
-                # Convert WebM data to WAV
-                if not convert_webm_to_wav(audio_data, temp_path):
-                    raise Exception("Failed to convert audio format")
-                
-                # Transcribe
-                result = transcribe_audio(temp_path, args.model, args.language)
-                
-            finally:
-                # Cleanup
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
+            if args.stdin_format:
+                audio = decode_raw_pcm(audio_data, args.stdin_format,
+                                       args.sample_rate or SAMPLE_RATE, args.channels or 1)
+            else:
+                audio = decode_audio_bytes(audio_data)
+            if args.long_form:
+                result = transcribe_long(audio, args.model, args.language,
+                                         workers=args.workers, chunk_seconds=args.chunk_seconds,
+                                         vad=args.vad, backend=args.backend, dtype=dtype,
+                                         threads=args.threads)
+            else:
+                result = transcribe_audio(audio, args.model, args.language,
+                                          vad=args.vad, backend=args.backend, dtype=dtype)
                     
         else:
             # Process file directly
-            if not os.path.exists(args.input):
+            input_path = args.input[0]
+            if not os.path.exists(input_path):
                 result = {
                     'success': False,
-                    'error': f'Input file not found: {args.input}',
+                    'error': f'Input file not found: {input_path}',
                     'text': '',
                     'language': 'unknown'
                 }
+            elif args.low_memory:
+                result = transcribe_low_memory(input_path, args.model, args.language,
+                                               vad=args.vad, backend=args.backend, dtype=dtype)
+            elif args.long_form:
+                result = transcribe_long(input_path, args.model, args.language,
+                                         workers=args.workers, chunk_seconds=args.chunk_seconds,
+                                         vad=args.vad, backend=args.backend, dtype=dtype,
+                                         threads=args.threads)
             else:
-                result = transcribe_audio(args.input, args.model, args.language)
+                result = transcribe_audio(input_path, args.model, args.language,
+                                          vad=args.vad, backend=args.backend, dtype=dtype)
         
         # Output result as JSON to stdout, ensuring it's the only thing there
         print(json.dumps(result, ensure_ascii=False, indent=2), flush=True)
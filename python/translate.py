@@ -5,9 +5,55 @@ Translation script using LibreTranslate or Google Translate API
 
 import sys
 import json
+import asyncio
+import functools
+import time
+import hashlib
+import sqlite3
 import argparse
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from cache_dir import get_cache_dir
+
+# Translation cache defaults
+DEFAULT_CACHE_TTL_HOURS = 24 * 30
+DEFAULT_CACHE_MAX_ENTRIES = 50000
+DEFAULT_CACHE_MEMORY_ENTRIES = 1024
+
+# HTTP connection pool defaults
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5
+
+# Concurrent requests allowed per backend by translate_many(). A local
+# LibreTranslate server is CPU-bound, so it gets fewer than Google.
+DEFAULT_CONCURRENCY = {
+    'libretranslate': 4,
+    'google': 8
+}
+
+# Previous segments sent along with each one in --segments mode
+DEFAULT_SEGMENT_CONTEXT = 2
+
+# Requests handled at once by --serve
+DEFAULT_SERVE_WORKERS = 8
+
+# Per-request limits for batch translation. Google Translate v2 accepts at
+# most 128 q segments and recommends staying under 5000 characters;
+# LibreTranslate servers commonly enforce similar character limits.
+GOOGLE_MAX_BATCH_ITEMS = 128
+GOOGLE_MAX_BATCH_CHARS = 5000
+LIBRETRANSLATE_MAX_BATCH_ITEMS = 50
+LIBRETRANSLATE_MAX_BATCH_CHARS = 5000
 
 def install_requirements():
     """Check if required packages are available"""
@@ -19,6 +65,119 @@ def install_requirements():
         print("Run: pip install requests", file=sys.stderr)
         return False
 
+_connection_counts = {'opened': 0, 'checkouts': 0}
+_connection_lock = threading.Lock()
+
+def _count_connection(kind):
+    with _connection_lock:
+        _connection_counts[kind] += 1
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        _count_connection('opened')
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _count_connection('opened')
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+    
+    def _get_conn(self, *args, **kwargs):
+        _count_connection('checkouts')
+        return super()._get_conn(*args, **kwargs)
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+    
+    def _get_conn(self, *args, **kwargs):
+        _count_connection('checkouts')
+        return super()._get_conn(*args, **kwargs)
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count opened and reused connections"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool
+        }
+
+_session = None
+_session_lock = threading.Lock()
+
+def _build_session(pool_size, retries, backoff, keep_alive):
+    retry_options = {
+        'total': retries,
+        'backoff_factor': backoff,
+        'status_forcelist': (429, 500, 502, 503, 504),
+        'raise_on_status': False
+    }
+    try:
+        # Translation requests are idempotent, so POST may be retried
+        retry = Retry(allowed_methods=frozenset(['GET', 'POST']), **retry_options)
+    except TypeError:
+        retry = Retry(method_whitelist=frozenset(['GET', 'POST']), **retry_options)
+    
+    session = requests.Session()
+    adapter = CountingHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                  max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+def configure_session(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES,
+                      backoff=DEFAULT_RETRY_BACKOFF, keep_alive=True):
+    """
+    (Re)create the shared HTTP session used by both translation backends
+    
+    Args:
+        pool_size (int): Connections kept per host
+        retries (int): Retries on connection errors and 429/5xx responses
+        backoff (float): Exponential backoff factor between retries (seconds)
+        keep_alive (bool): Reuse connections across requests
+    
+    Returns:
+        requests.Session: The shared session
+    """
+    global _session
+    session = _build_session(pool_size, retries, backoff, keep_alive)
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = session
+    return session
+
+def get_session():
+    """Return the shared HTTP session, creating it with defaults on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session(DEFAULT_POOL_SIZE, DEFAULT_RETRIES,
+                                      DEFAULT_RETRY_BACKOFF, True)
+        return _session
+
+def connection_stats():
+    """
+    Report HTTP connection reuse
+    
+    Returns:
+        dict: Connections opened, requests sent and connections reused
+    """
+    with _connection_lock:
+        opened = _connection_counts['opened']
+        checkouts = _connection_counts['checkouts']
+    return {
+        'opened': opened,
+        'requests': checkouts,
+        'reused': max(0, checkouts - opened)
+    }
+
 def translate_with_libretranslate(text, target_lang, source_lang='auto', api_url='http://localhost:5000'):
     """
     Translate text using LibreTranslate API
@@ -46,7 +205,7 @@ def translate_with_libretranslate(text, target_lang, source_lang='auto', api_url
             'Content-Type': 'application/json'
         }
         
-        response = requests.post(url, json=data, headers=headers, timeout=30)
+        response = get_session().post(url, json=data, headers=headers, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -122,7 +281,7 @@ def translate_with_google(text, target_lang, source_lang='auto', api_key=None):
         if source_lang != 'auto':
             params['source'] = source_lang
         
-        response = requests.post(url, params=params, timeout=30)
+        response = get_session().post(url, params=params, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -155,7 +314,157 @@ def translate_with_google(text, target_lang, source_lang='auto', api_key=None):
             'service': 'Google Translate'
         }
 
-def translate_text(text, target_lang, source_lang='auto', service='libretranslate', **kwargs):
+def normalize_text(text):
+    """Normalize text for cache lookups (Unicode form and whitespace)"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+class TranslationCache:
+    """
+    Two-level cache of successful translations
+    
+    An in-memory LRU sits in front of a SQLite store so results survive
+    across processes. Entries are keyed by (service, source, target,
+    normalized text), expire after ttl_seconds, and the store is trimmed to
+    max_entries by last access time.
+    """
+    
+    def __init__(self, path=None, ttl_seconds=DEFAULT_CACHE_TTL_HOURS * 3600,
+                 max_entries=DEFAULT_CACHE_MAX_ENTRIES,
+                 memory_entries=DEFAULT_CACHE_MEMORY_ENTRIES):
+        self.path = Path(path) if path else get_cache_dir() / 'translations.sqlite3'
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+    
+    def _connect(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, '
+                'created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)')
+            self._db.commit()
+        return self._db
+    
+    @staticmethod
+    def make_key(service, source_lang, target_lang, text):
+        """Build the cache key for a translation request"""
+        raw = json.dumps([service.lower(), source_lang, target_lang, normalize_text(text)],
+                         ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, service, source_lang, target_lang, text):
+        """
+        Look up a cached translation
+        
+        Returns:
+            dict: Cached translation result, or None on a miss
+        """
+        key = self.make_key(service, source_lang, target_lang, text)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return dict(entry[1])
+            
+            try:
+                db = self._connect()
+                row = db.execute('SELECT result, created FROM translations WHERE key = ?',
+                                 (key,)).fetchone()
+                if row is not None and now - row[1] < self.ttl_seconds:
+                    db.execute('UPDATE translations SET accessed = ? WHERE key = ?', (now, key))
+                    db.commit()
+                    result = json.loads(row[0])
+                    self._remember(key, row[1], result)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return dict(result)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Translation cache error: {e}", file=sys.stderr)
+            
+            self.misses += 1
+            return None
+    
+    def put(self, service, source_lang, target_lang, text, result):
+        """Store a successful translation result"""
+        if not result.get('success'):
+            return
+        key = self.make_key(service, source_lang, target_lang, text)
+        now = time.time()
+        result = {k: v for k, v in result.items() if k != 'cache'}
+        with self._lock:
+            self._remember(key, now, result)
+            try:
+                db = self._connect()
+                db.execute('INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)',
+                           (key, json.dumps(result, ensure_ascii=False), now, now))
+                self._trim(db, now)
+                db.commit()
+            except (sqlite3.Error, OSError) as e:
+                print(f"Translation cache error: {e}", file=sys.stderr)
+    
+    def _remember(self, key, created, result):
+        self._memory[key] = (created, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _trim(self, db, now):
+        db.execute('DELETE FROM translations WHERE created < ?', (now - self.ttl_seconds,))
+        count = db.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+        if count > self.max_entries:
+            db.execute(
+                'DELETE FROM translations WHERE key IN '
+                '(SELECT key FROM translations ORDER BY accessed LIMIT ?)',
+                (count - self.max_entries,)
+            )
+    
+    def stats(self):
+        """
+        Report cache statistics
+        
+        Returns:
+            dict: Hit/miss counters and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+    
+    def close(self):
+        """Close the SQLite store"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+_default_cache = None
+
+def get_translation_cache():
+    """Return the process-wide translation cache, creating it on first use"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TranslationCache()
+    return _default_cache
+
+def translate_text(text, target_lang, source_lang='auto', service='libretranslate', cache=None, **kwargs):
     """
     Translate text using the specified service
     
@@ -164,6 +473,8 @@ def translate_text(text, target_lang, source_lang='auto', service='libretranslat
         target_lang (str): Target language code
         source_lang (str): Source language code
         service (str): Translation service ('libretranslate' or 'google')
+        cache (TranslationCache): Cache to use; the process-wide cache if
+            None, no caching if False
         **kwargs: Additional service-specific parameters
     
     Returns:
@@ -179,13 +490,21 @@ def translate_text(text, target_lang, source_lang='auto', service='libretranslat
             'service': service
         }
     
+    if cache is None:
+        cache = get_translation_cache()
+    if cache:
+        cached = cache.get(service, source_lang, target_lang, text)
+        if cached is not None:
+            cached['cache'] = dict(cache.stats(), hit=True)
+            return cached
+    
     if service.lower() == 'libretranslate':
-        return translate_with_libretranslate(
+        result = translate_with_libretranslate(
             text, target_lang, source_lang, 
             kwargs.get('api_url', 'http://localhost:5000')
         )
     elif service.lower() == 'google':
-        return translate_with_google(
+        result = translate_with_google(
             text, target_lang, source_lang,
             kwargs.get('api_key')
         )
@@ -198,11 +517,509 @@ def translate_text(text, target_lang, source_lang='auto', service='libretranslat
             'target_language': target_lang,
             'service': service
         }
+    
+    if cache:
+        cache.put(service, source_lang, target_lang, text, result)
+        result['cache'] = dict(cache.stats(), hit=False)
+    return result
+
+def _error_result(error, source_lang, target_lang, service):
+    return {
+        'success': False,
+        'error': error,
+        'translated_text': '',
+        'source_language': source_lang,
+        'target_language': target_lang,
+        'service': service
+    }
+
+def pack_batches(texts, max_items, max_chars):
+    """
+    Group texts into batches that respect per-request limits
+    
+    Args:
+        texts (list): (index, text) pairs
+        max_items (int): Maximum texts per batch
+        max_chars (int): Maximum total characters per batch; a single longer
+            text is sent on its own
+    
+    Returns:
+        list: Lists of (index, text) pairs
+    """
+    batches = []
+    current = []
+    current_chars = 0
+    for index, text in texts:
+        if current and (len(current) >= max_items or current_chars + len(text) > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append((index, text))
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+def translate_batch_with_libretranslate(texts, target_lang, source_lang='auto', api_url='http://localhost:5000'):
+    """
+    Translate several texts with one LibreTranslate request
+    
+    Args:
+        texts (list): Texts to translate
+        target_lang (str): Target language code
+        source_lang (str): Source language code (default: 'auto')
+        api_url (str): LibreTranslate API URL
+    
+    Returns:
+        list: Translation results aligned with texts
+    """
+    service = 'LibreTranslate'
+    try:
+        url = urljoin(api_url, '/translate')
+        
+        data = {
+            'q': list(texts),
+            'source': source_lang,
+            'target': target_lang,
+            'format': 'text'
+        }
+        
+        headers = {
+            'Content-Type': 'application/json'
+        }
+        
+        response = get_session().post(url, json=data, headers=headers, timeout=30)
+        
+        if response.status_code != 200:
+            error = f'LibreTranslate API error: {response.status_code} - {response.text}'
+            return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+        
+        translations = response.json().get('translatedText', [])
+        if not isinstance(translations, list) or len(translations) != len(texts):
+            error = 'LibreTranslate returned a batch of unexpected size'
+            return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+        
+        return [
+            {
+                'success': True,
+                'translated_text': translation,
+                'source_language': source_lang,
+                'target_language': target_lang,
+                'service': service
+            }
+            for translation in translations
+        ]
+        
+    except requests.exceptions.ConnectionError:
+        error = 'LibreTranslate service not available. Please start LibreTranslate server.'
+        return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+    except Exception as e:
+        error = f'LibreTranslate error: {str(e)}'
+        return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+
+def translate_batch_with_google(texts, target_lang, source_lang='auto', api_key=None):
+    """
+    Translate several texts with one Google Translate request
+    
+    Args:
+        texts (list): Texts to translate
+        target_lang (str): Target language code
+        source_lang (str): Source language code (default: 'auto')
+        api_key (str): Google Translate API key
+    
+    Returns:
+        list: Translation results aligned with texts
+    """
+    service = 'Google Translate'
+    try:
+        if not api_key:
+            error = 'Google Translate API key not provided'
+            return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+        
+        url = 'https://translation.googleapis.com/language/translate/v2'
+        
+        # Repeated q fields go in the form body to stay clear of URL limits
+        data = {
+            'q': list(texts),
+            'target': target_lang,
+            'format': 'text'
+        }
+        
+        if source_lang != 'auto':
+            data['source'] = source_lang
+        
+        response = get_session().post(url, params={'key': api_key}, data=data, timeout=30)
+        
+        if response.status_code != 200:
+            error = f'Google Translate API error: {response.status_code} - {response.text}'
+            return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+        
+        translations = response.json()['data']['translations']
+        if not isinstance(translations, list) or len(translations) != len(texts):
+            error = 'Google Translate returned a batch of unexpected size'
+            return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+        
+        return [
+            {
+                'success': True,
+                'translated_text': translation['translatedText'],
+                'source_language': translation.get('detectedSourceLanguage', source_lang),
+                'target_language': target_lang,
+                'service': service
+            }
+            for translation in translations
+        ]
+        
+    except Exception as e:
+        error = f'Google Translate error: {str(e)}'
+        return [_error_result(error, source_lang, target_lang, service) for _ in texts]
+
+def translate_batch(texts, target_lang, source_lang='auto', service='libretranslate', cache=None, **kwargs):
+    """
+    Translate a list of texts using as few requests as possible
+    
+    Cached texts are answered locally; the rest are packed into batches that
+    respect the service's per-request limits.
+    
+    Args:
+        texts (list): Texts to translate
+        target_lang (str): Target language code
+        source_lang (str): Source language code
+        service (str): Translation service ('libretranslate' or 'google')
+        cache (TranslationCache): Cache to use; the process-wide cache if
+            None, no caching if False
+        **kwargs: Additional service-specific parameters
+    
+    Returns:
+        dict: Batch result whose 'translations' are aligned with texts
+    """
+    if service.lower() == 'libretranslate':
+        api_url = kwargs.get('api_url', 'http://localhost:5000')
+        send = lambda batch: translate_batch_with_libretranslate(batch, target_lang, source_lang, api_url)
+        max_items, max_chars = LIBRETRANSLATE_MAX_BATCH_ITEMS, LIBRETRANSLATE_MAX_BATCH_CHARS
+    elif service.lower() == 'google':
+        api_key = kwargs.get('api_key')
+        send = lambda batch: translate_batch_with_google(batch, target_lang, source_lang, api_key)
+        max_items, max_chars = GOOGLE_MAX_BATCH_ITEMS, GOOGLE_MAX_BATCH_CHARS
+    else:
+        return {
+            'success': False,
+            'error': f'Unknown translation service: {service}',
+            'translations': [],
+            'source_language': source_lang,
+            'target_language': target_lang,
+            'service': service
+        }
+    
+    if cache is None:
+        cache = get_translation_cache()
+    
+    results = [None] * len(texts)
+    pending = []
+    for index, text in enumerate(texts):
+        if not text or not text.strip():
+            results[index] = _error_result('No text to translate', source_lang, target_lang, service)
+            continue
+        cached = cache.get(service, source_lang, target_lang, text) if cache else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.append((index, text))
+    
+    batches = pack_batches(pending, max_items, max_chars)
+    for batch in batches:
+        batch_results = send([text for _, text in batch])
+        for (index, text), result in zip(batch, batch_results):
+            results[index] = result
+            if cache:
+                cache.put(service, source_lang, target_lang, text, result)
+    
+    print(f"Translated {len(texts)} texts with {len(batches)} requests", file=sys.stderr)
+    
+    batch_result = {
+        'success': all(result['success'] for result in results),
+        'translations': results,
+        'source_language': source_lang,
+        'target_language': target_lang,
+        'service': service,
+        'requests': len(batches),
+        'connections': connection_stats()
+    }
+    if cache:
+        batch_result['cache'] = cache.stats()
+    return batch_result
+
+# Per-backend executors; each one's thread count is that backend's in-flight limit
+_backend_executors = {}
+_backend_executors_lock = threading.Lock()
+
+def _backend_executor(service, limit):
+    """
+    Executor shared by every async request to a backend
+    
+    Its threads bound the requests in flight, whichever event loop or
+    translate_many() call they come from; the first call for a backend
+    fixes the limit.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    service = service.lower()
+    with _backend_executors_lock:
+        if service not in _backend_executors:
+            _backend_executors[service] = ThreadPoolExecutor(
+                max_workers=limit, thread_name_prefix=f'translate-{service}'
+            )
+        return _backend_executors[service]
+
+async def translate_text_async(text, target_lang, source_lang='auto', service='libretranslate',
+                               cache=None, concurrency=None, **kwargs):
+    """
+    Translate one text without blocking the event loop
+    
+    The request runs on the shared pooled session in a thread of the
+    backend's executor, which holds at most `concurrency` requests in flight.
+    
+    Args:
+        text (str): Text to translate
+        target_lang (str): Target language code
+        source_lang (str): Source language code
+        service (str): Translation service ('libretranslate' or 'google')
+        cache (TranslationCache): Cache to use; the process-wide cache if
+            None, no caching if False
+        concurrency (int): In-flight request limit for this backend; the
+            first call for a backend sets it
+        **kwargs: Additional service-specific parameters
+    
+    Returns:
+        dict: Translation result
+    """
+    limit = concurrency or DEFAULT_CONCURRENCY.get(service.lower(), 4)
+    call = functools.partial(translate_text, text, target_lang, source_lang, service, cache, **kwargs)
+    executor = _backend_executor(service, limit)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+async def translate_many(texts, target_lang, source_lang='auto', service='libretranslate',
+                         cache=None, concurrency=None, **kwargs):
+    """
+    Translate many texts concurrently
+    
+    Up to `concurrency` requests are in flight per backend, so network
+    latency overlaps instead of adding up.
+    
+    Args:
+        texts (list): Texts to translate
+        target_lang (str): Target language code
+        source_lang (str): Source language code
+        service (str): Translation service ('libretranslate' or 'google')
+        cache (TranslationCache): Cache to use; the process-wide cache if
+            None, no caching if False
+        concurrency (int): In-flight request limit for this backend; the
+            first call for a backend sets it
+        **kwargs: Additional service-specific parameters
+    
+    Returns:
+        list: Translation results aligned with texts
+    """
+    if cache is None:
+        # Open the shared cache before fanning out to worker threads
+        cache = get_translation_cache()
+    return await asyncio.gather(*(
+        translate_text_async(text, target_lang, source_lang, service, cache, concurrency, **kwargs)
+        for text in texts
+    ))
+
+def translate_with_context(text, context, target_lang, source_lang='auto',
+                           service='libretranslate', cache=None, **kwargs):
+    """
+    Translate text with preceding sentences as context
+    
+    The context lines and the text are translated together, one per line,
+    and the last line of the translation is kept. If the service does not
+    preserve the line structure, the text is translated on its own.
+    
+    Args:
+        text (str): Text to translate
+        context (list): Preceding source texts, oldest first
+        target_lang (str): Target language code
+        source_lang (str): Source language code
+        service (str): Translation service ('libretranslate' or 'google')
+        cache (TranslationCache): Cache to use; the process-wide cache if
+            None, no caching if False
+        **kwargs: Additional service-specific parameters
+    
+    Returns:
+        dict: Translation result for text alone
+    """
+    context = [line for line in (' '.join(c.split()) for c in context) if line]
+    if context:
+        joined = '\n'.join(context + [' '.join(text.split())])
+        result = translate_text(joined, target_lang, source_lang, service, cache, **kwargs)
+        lines = result.get('translated_text', '').split('\n')
+        if result['success'] and len(lines) == len(context) + 1:
+            result['translated_text'] = lines[-1].strip()
+            return result
+    
+    return translate_text(text, target_lang, source_lang, service, cache, **kwargs)
+
+def translate_segments(segments, target_lang, source_lang='auto', service='libretranslate',
+                       context_size=DEFAULT_SEGMENT_CONTEXT, cache=None, **kwargs):
+    """
+    Translate transcript segments one by one as they arrive
+    
+    Args:
+        segments (iterable): Segment dicts with 'start', 'end' and 'text', as
+            produced by transcribe_audio(); may be a live stream
+        target_lang (str): Target language code
+        source_lang (str): Source language code
+        service (str): Translation service ('libretranslate' or 'google')
+        context_size (int): Previous segments sent along for coherence
+        cache (TranslationCache): Cache to use; the process-wide cache if
+            None, no caching if False
+        **kwargs: Additional service-specific parameters
+    
+    Yields:
+        dict: The segment with 'translated_text' and 'success' added
+    """
+    history = []
+    for segment in segments:
+        text = (segment.get('text') or '').strip()
+        translated = dict(segment)
+        if not text:
+            translated.update({'success': True, 'translated_text': ''})
+            yield translated
+            continue
+        
+        context = history[-context_size:] if context_size > 0 else []
+        result = translate_with_context(text, context, target_lang, source_lang,
+                                        service, cache, **kwargs)
+        translated['success'] = result['success']
+        translated['translated_text'] = result.get('translated_text', '')
+        if not result['success']:
+            translated['error'] = result.get('error', '')
+        history.append(text)
+        yield translated
+
+def read_segment_stream(stream):
+    """
+    Parse JSON segment lines, skipping provisional and summary events
+    
+    Accepts plain segment objects as well as the 'final' events printed by
+    transcribe.py --stream.
+    
+    Yields:
+        dict: Segment objects
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            segment = json.loads(line)
+        except ValueError:
+            print(f"Skipping invalid segment line: {line[:80]}", file=sys.stderr)
+            continue
+        if not isinstance(segment, dict) or segment.get('type') in ('partial', 'done') or 'ready' in segment:
+            continue
+        yield segment
+
+def handle_serve_request(request, defaults, cache):
+    """
+    Handle a single --serve request
+    
+    Args:
+        request (dict): Parsed request with 'text' (or 'texts' for a batch)
+            and optional 'target', 'source', 'service', 'api_key' and
+            'api_url' overriding the server defaults.
+            {"command": "stats"} returns cache and connection statistics.
+        defaults (dict): Server defaults for the optional fields
+        cache (TranslationCache): Shared cache, or False
+    
+    Returns:
+        dict: Translation result
+    """
+    if request.get('command') == 'stats':
+        return {
+            'success': True,
+            'cache': cache.stats() if cache else None,
+            'connections': connection_stats()
+        }
+    
+    options = dict(defaults)
+    options.update({key: request[key] for key in defaults if request.get(key)})
+    if not options.get('target'):
+        return _error_result('Target language not specified', options['source'], None, options['service'])
+    
+    extra = {'api_key': options['api_key'], 'api_url': options['api_url']}
+    if 'texts' in request:
+        texts = request['texts']
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return _error_result("'texts' must be a JSON list of strings", options['source'],
+                                 options['target'], options['service'])
+        return translate_batch(texts, options['target'], options['source'],
+                               options['service'], cache, **extra)
+    return translate_text(request.get('text', ''), options['target'], options['source'],
+                          options['service'], cache, **extra)
+
+def serve(defaults, cache, workers=DEFAULT_SERVE_WORKERS):
+    """
+    Run a persistent translation loop over stdin/stdout
+    
+    Each stdin line is a JSON request such as {"id": 1, "text": "Hello",
+    "target": "es"}. Requests are handled concurrently, so several can be
+    in flight at once; each is answered with one JSON line echoing its 'id',
+    in completion order. The HTTP session and cache are shared throughout.
+    
+    Args:
+        defaults (dict): Default 'target', 'source', 'service', 'api_key'
+            and 'api_url' for requests that omit them
+        cache (TranslationCache): Shared cache, or False
+        workers (int): Requests handled at once
+    
+    Returns:
+        int: Exit code
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    output_lock = threading.Lock()
+    
+    def respond(request_id, result):
+        result['id'] = request_id
+        line = json.dumps(result, ensure_ascii=False)
+        with output_lock:
+            print(line, flush=True)
+    
+    def run(request_id, request):
+        try:
+            result = handle_serve_request(request, defaults, cache)
+        except Exception as e:
+            print(f"Serve request error: {e}", file=sys.stderr)
+            result = _error_result(str(e), defaults['source'], defaults['target'], defaults['service'])
+        respond(request_id, result)
+    
+    print(json.dumps({'ready': True}), flush=True)
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('Request must be a JSON object')
+            except ValueError as e:
+                respond(None, _error_result(str(e), defaults['source'], defaults['target'], defaults['service']))
+                continue
+            
+            pool.submit(run, request.get('id'), request)
+    
+    return 0
 
 def main():
     parser = argparse.ArgumentParser(description='Translate text using LibreTranslate or Google Translate')
-    parser.add_argument('--text', '-t', required=True, help='Text to translate')
-    parser.add_argument('--target', '-tl', required=True, help='Target language code')
+    parser.add_argument('--text', '-t', help='Text to translate')
+    parser.add_argument('--target', '-tl', help='Target language code')
     parser.add_argument('--source', '-sl', default='auto', help='Source language code (default: auto)')
     parser.add_argument('--service', '-s', default='libretranslate', 
                        choices=['libretranslate', 'google'],
@@ -212,9 +1029,40 @@ def main():
                        help='LibreTranslate API URL')
     parser.add_argument('--stdin', action='store_true', 
                        help='Read text from stdin')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the translation cache')
+    parser.add_argument('--cache-path', help='SQLite file for the translation cache')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL_HOURS,
+                       help='Hours a cached translation stays valid')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_MAX_ENTRIES,
+                       help='Maximum number of cached translations')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                       help='HTTP connections kept open per translation host')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                       help='Retries on connection errors and 429/5xx responses')
+    parser.add_argument('--no-keep-alive', action='store_true',
+                       help='Open a new HTTP connection for every request')
+    parser.add_argument('--batch', action='store_true',
+                       help='Treat the text as a JSON list of texts and translate them together')
+    parser.add_argument('--concurrency', type=int,
+                       help='With --batch, send one request per text with this many in flight')
+    parser.add_argument('--segments', action='store_true',
+                       help='Translate JSON segment lines from stdin as they arrive')
+    parser.add_argument('--context', type=int, default=DEFAULT_SEGMENT_CONTEXT,
+                       help='Previous segments used as context in --segments mode')
+    parser.add_argument('--serve', action='store_true',
+                       help='Stay running and answer JSON requests, one per stdin line')
+    parser.add_argument('--workers', type=int, default=DEFAULT_SERVE_WORKERS,
+                       help='Requests handled at once in --serve mode')
     
     args = parser.parse_args()
     
+    if not args.serve:
+        if not args.stdin and not args.segments and args.text is None:
+            parser.error('Either --text, --stdin, --segments or --serve must be specified')
+        if not args.target:
+            parser.error('--target is required unless --serve is used')
+    
     try:
         # Check and install requirements
         if not install_requirements():
@@ -229,14 +1077,64 @@ def main():
             print(json.dumps(result))
             return 1
         
+        configure_session(args.pool_size, args.retries, keep_alive=not args.no_keep_alive)
+        
+        cache = False
+        if not args.no_cache:
+            cache = TranslationCache(args.cache_path, args.cache_ttl * 3600, args.cache_size)
+        
+        if args.serve:
+            defaults = {
+                'target': args.target,
+                'source': args.source,
+                'service': args.service,
+                'api_key': args.api_key,
+                'api_url': args.api_url
+            }
+            return serve(defaults, cache, args.workers)
+        
+        if args.segments:
+            for segment in translate_segments(
+                read_segment_stream(sys.stdin), args.target, args.source, args.service,
+                args.context, cache, api_key=args.api_key, api_url=args.api_url
+            ):
+                print(json.dumps(segment, ensure_ascii=False), flush=True)
+            return 0
+        
         if args.stdin:
             text = sys.stdin.read().strip()
         else:
             text = args.text
         
+        if args.batch:
+            texts = json.loads(text)
+            if not isinstance(texts, list):
+                raise ValueError('--batch expects a JSON list of texts')
+            if args.concurrency:
+                translations = asyncio.run(translate_many(
+                    texts, args.target, args.source, args.service, cache, args.concurrency,
+                    api_key=args.api_key, api_url=args.api_url
+                ))
+                result = {
+                    'success': all(item['success'] for item in translations),
+                    'translations': translations,
+                    'source_language': args.source,
+                    'target_language': args.target,
+                    'service': args.service,
+                    'requests': len(texts),
+                    'connections': connection_stats()
+                }
+            else:
+                result = translate_batch(
+                    texts, args.target, args.source, args.service, cache,
+                    api_key=args.api_key, api_url=args.api_url
+                )
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+            return 0 if result['success'] else 1
+        
         # Perform translation
         result = translate_text(
-            text, args.target, args.source, args.service,
+            text, args.target, args.source, args.service, cache,
             api_key=args.api_key, api_url=args.api_url
         )
         